@@ -1,12 +1,25 @@
 import streamlit as st
-import pandas as pd
 import os
 import io
+import json
 import base64
+import tempfile
+import time
 from datetime import datetime
 from models import (
-    init_db, get_session, ScoutingSession, PitScouting, MatchScore, MatchSchedule
+    init_db, get_engine, get_session, get_read_engine, get_read_session,
+    get_database_url, get_read_database_url, ScoutingSession, SessionArchive
 )
+from archive import ARCHIVE_DIR, load_archived_snapshot, restore_session
+from backup import write_backup
+from cards import comparison_card, match_card, pit_card
+from changefeed import ChangeFeed
+from instrumentation import ENABLED as METRICS_ENABLED, metrics
+from snapshot import SnapshotCache, data_version, load_photo
+from writer import WriteQueue
+
+# pandas, numpy, scipy and openpyxl are imported inside the analytics and
+# export paths below, so server start and the login page never load them.
 
 # Configure page for mobile responsiveness
 st.set_page_config(
@@ -122,33 +135,163 @@ def get_or_create_session(team_code):
     finally:
         db.close()
 
-def get_pit_scouting_data(session_id):
-    """Get all pit scouting data for a session."""
-    db = get_session()
+@st.cache_resource
+def get_change_feed():
+    """Get the process-wide change feed, starting its listener once."""
+    read_engine = get_read_engine() if get_read_database_url() != get_database_url() else None
+    return ChangeFeed(get_engine(), read_engine).start()
+
+@st.cache_resource
+def get_write_queue():
+    """Get the process-wide background writer, replaying old journals once.
+
+    Its commits reach the change feed through the change log like any other
+    write; publishing them here as well would rerun every viewer twice.
+    """
+    return WriteQueue(get_session, get_database_url()).start()
+
+# How long a submit waits for its commit so the rerun already shows it.
+SUBMIT_WAIT = 0.5
+# How long a scout reads from the primary after submitting, to outlast replica lag.
+STICKY_SECONDS = 10.0
+
+def queue_write(kind, session_id, values, label):
+    """Hand a submit to the background writer and track it for this scout."""
+    writer = get_write_queue()
+    job_id = writer.submit(kind, session_id, values)
+    st.session_state.setdefault('pending_writes', {})[job_id] = label
+    st.session_state.last_write_at = time.time()
+    writer.wait(job_id, SUBMIT_WAIT)
+
+def read_session():
+    """Open a session for reads: the primary for a scout who just wrote, else the replica."""
+    if time.time() - st.session_state.get('last_write_at', 0.0) < STICKY_SECONDS:
+        return get_session()
+    return get_read_session()
+
+@st.fragment(run_every=2)
+def live_updates(session_id):
+    """Report this scout's queued writes and rerun when the session's data changes."""
+    writer = get_write_queue()
+    pending = st.session_state.get('pending_writes', {})
+    for job_id, label in list(pending.items()):
+        state, error = writer.status(job_id)
+        if state == 'queued':
+            continue
+        if state == 'saved':
+            st.toast(f"✅ {label}")
+        elif state == 'failed':
+            st.toast(f"❌ Could not save: {label} ({error})")
+        del pending[job_id]
+        writer.forget(job_id)
+    if pending:
+        st.caption(f"⏳ Saving {len(pending)} submission(s)...")
+    
+    if get_change_feed().version(session_id) != st.session_state.get('seen_change'):
+        st.rerun()
+
+def get_data_version(session_id):
+    """Get a token that changes whenever the session's scouting data changes."""
+    db = read_session()
     try:
-        data = db.query(PitScouting).filter(PitScouting.session_id == session_id).all()
-        return data
+        return data_version(db, session_id)
     finally:
         db.close()
 
-def get_match_scores_data(session_id):
-    """Get all match scores for a session."""
-    db = get_session()
+@st.cache_resource
+def get_snapshot_cache(session_id):
+    """Get the incrementally refreshed snapshot cache for a session."""
+    return SnapshotCache(session_id)
+
+@st.cache_resource(max_entries=16)
+def load_session_snapshot(session_id, data_version):
+    """Load an indexed snapshot of a session, cached per data version."""
+    db = read_session()
+    try:
+        return get_snapshot_cache(session_id).get(db, data_version)
+    finally:
+        db.close()
+
+def get_session_snapshot(session_id):
+    """Get the current snapshot of a session."""
+    return load_session_snapshot(session_id, get_data_version(session_id))
+
+@st.cache_data(max_entries=64)
+def get_robot_photo(pit_id, timestamp):
+    """Load a robot photo, cached until its pit record changes."""
+    db = read_session()
     try:
-        data = db.query(MatchScore).filter(MatchScore.session_id == session_id).all()
-        return data
+        return load_photo(db, pit_id)
     finally:
         db.close()
 
-def get_match_schedule_data(session_id):
-    """Get match schedule for a session."""
+@st.cache_resource
+def get_rating_engine(session_id):
+    """Get the shared rating engine for a session."""
+    from ratings import RatingEngine
+    return RatingEngine()
+
+@st.cache_data(max_entries=16)
+def get_team_ratings(session_id, data_version):
+    """Get OPR/DPR/CCWM for every team, cached per data version."""
+    from ratings import alliance_scores
+    snapshot = load_session_snapshot(session_id, data_version)
+    engine = get_rating_engine(session_id)
+    return engine.rate(alliance_scores(snapshot.alliances(), snapshot.consensus))
+
+@st.cache_data(max_entries=16)
+def get_team_profiles(session_id, data_version):
+    """Get Monte Carlo sampling profiles for every team, cached per data version."""
+    from simulator import team_profiles
+    return team_profiles(load_session_snapshot(session_id, data_version).consensus)
+
+@st.cache_data(max_entries=16)
+def get_upcoming_predictions(session_id, data_version):
+    """Get win probabilities for every incomplete scheduled match."""
+    from simulator import simulate_pairings
+    profiles = get_team_profiles(session_id, data_version)
+    snapshot = load_session_snapshot(session_id, data_version)
+    upcoming = [m for m in snapshot.schedule if not m.is_completed]
+    pairings = [snapshot.match_alliances(m) for m in upcoming]
+    results = simulate_pairings(pairings, profiles, seed=session_id)
+    return [(m.match_number, red, blue, r) for m, (red, blue), r in zip(upcoming, pairings, results)]
+
+@st.cache_resource(max_entries=16)
+def get_pick_list(session_id, data_version):
+    """Get the pick-list ranker for a session, rebuilt per data version."""
+    from picklist import PickList, team_stats
+    ratings = get_team_ratings(session_id, data_version)
+    return PickList(*team_stats(load_session_snapshot(session_id, data_version).consensus, ratings))
+
+@st.cache_data(max_entries=16)
+def get_team_trends(session_id, data_version):
+    """Get per-team trend stats, cached per data version."""
+    from trends import team_trends
+    return team_trends(load_session_snapshot(session_id, data_version).consensus)
+
+@st.cache_data(ttl=30)
+def get_archive_file(session_id):
+    """Get the cold-storage file of an archived session, or None for an active one."""
     db = get_session()
     try:
-        data = db.query(MatchSchedule).filter(MatchSchedule.session_id == session_id).order_by(MatchSchedule.match_number).all()
-        return data
+        return db.query(SessionArchive.path).filter(
+            SessionArchive.session_id == session_id,
+            SessionArchive.archived_at.isnot(None)
+        ).scalar()
     finally:
         db.close()
 
+@st.cache_resource(max_entries=4)
+def get_archived_snapshot(archive_file, session_id):
+    """Read an archived session from cold storage, once per file."""
+    return load_archived_snapshot(os.path.join(ARCHIVE_DIR, archive_file), session_id)
+
+def show_robot_photo(entry, **kwargs):
+    """Display a pit record's robot photo, counting the bytes sent."""
+    photo = get_robot_photo(entry.id, entry.timestamp)
+    metrics.count_image(photo)
+    st.image(photo, **kwargs)
+
 def init_session_state():
     """Initialize session state variables."""
     if 'team_code' not in st.session_state:
@@ -190,6 +333,8 @@ def main_app():
     """Main application after login."""
     team_code = st.session_state.team_code
     session_id = st.session_state.session_id
+    st.session_state.seen_change = get_change_feed().version(session_id)
+    live_updates(session_id)
     
     col1, col2, col3 = st.columns([2, 1, 1])
     with col1:
@@ -204,36 +349,30 @@ def main_app():
     
     st.markdown("---")
     
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-        "📋 Pit Scouting", 
-        "🎯 Match Scoring", 
-        "📅 Schedule",
-        "📊 Dashboard", 
-        "🔍 Search",
-        "⚖️ Compare",
-        "📤 Export"
-    ])
-    
-    with tab1:
-        pit_scouting_page(session_id)
-    
-    with tab2:
-        match_scoring_page(session_id)
-    
-    with tab3:
-        match_schedule_page(session_id)
-    
-    with tab4:
-        dashboard_page(session_id)
-    
-    with tab5:
-        search_page(session_id)
+    archive_file = get_archive_file(session_id)
+    if archive_file:
+        with metrics.page("📦 Archived"):
+            archived_session_page(session_id, archive_file)
+        return
     
-    with tab6:
-        comparison_page(session_id)
+    pages = [
+        ("📋 Pit Scouting", pit_scouting_page),
+        ("🎯 Match Scoring", match_scoring_page),
+        ("📅 Schedule", match_schedule_page),
+        ("📊 Dashboard", dashboard_page),
+        ("🔍 Search", search_page),
+        ("⚖️ Compare", comparison_page),
+        ("📈 Ratings", ratings_page),
+        ("🏆 Pick List", pick_list_page),
+        ("📤 Export", export_page)
+    ]
+    if st.query_params.get("admin"):
+        pages.append(("🛠️ Admin", admin_page))
     
-    with tab7:
-        export_page(session_id)
+    tabs = st.tabs([label for label, _ in pages])
+    for tab, (label, page) in zip(tabs, pages):
+        with tab, metrics.page(label):
+            page(session_id)
 
 def pit_scouting_page(session_id):
     """Pit scouting form with photo upload."""
@@ -250,6 +389,7 @@ def pit_scouting_page(session_id):
     if uploaded_photo:
         st.session_state.pending_photo = uploaded_photo.read()
         st.session_state.pending_photo_name = uploaded_photo.name
+        metrics.count_image(st.session_state.pending_photo)
         st.image(st.session_state.pending_photo, caption="Photo preview", width=200)
     
     with st.form("pit_scouting_form", clear_on_submit=True):
@@ -320,84 +460,43 @@ def pit_scouting_page(session_id):
             if not frc_team:
                 st.error("Please enter the FRC team number")
             else:
-                db = get_session()
-                try:
-                    existing = db.query(PitScouting).filter(
-                        PitScouting.session_id == session_id,
-                        PitScouting.frc_team == frc_team
-                    ).first()
-                    
-                    photo_data = st.session_state.pending_photo
-                    photo_filename = st.session_state.pending_photo_name
-                    
-                    if existing:
-                        existing.team_name = team_name
-                        existing.drivetrain = drivetrain if drivetrain != "Select..." else ""
-                        existing.robot_weight = robot_weight
-                        existing.robot_height = robot_height
-                        existing.programming_lang = programming_lang if programming_lang != "Select..." else ""
-                        existing.years_experience = years_experience
-                        existing.auto_scoring = auto_scoring
-                        existing.auto_mobility = auto_mobility
-                        existing.auto_paths = auto_paths
-                        existing.can_climb = can_climb
-                        existing.can_intake_ground = can_intake_ground
-                        existing.can_intake_source = can_intake_source
-                        existing.can_shoot_speaker = can_shoot_speaker
-                        existing.can_score_amp = can_score_amp
-                        existing.has_vision = has_vision
-                        existing.strengths = strengths
-                        existing.weaknesses = weaknesses
-                        existing.strategy_notes = strategy_notes
-                        existing.scouter_name = scouter_name
-                        existing.timestamp = datetime.utcnow()
-                        if photo_data:
-                            existing.robot_photo = photo_data
-                            existing.photo_filename = photo_filename
-                        db.commit()
-                        st.success(f"✅ Updated pit scouting data for Team {frc_team}!")
-                    else:
-                        new_entry = PitScouting(
-                            session_id=session_id,
-                            frc_team=frc_team,
-                            team_name=team_name,
-                            drivetrain=drivetrain if drivetrain != "Select..." else "",
-                            robot_weight=robot_weight,
-                            robot_height=robot_height,
-                            programming_lang=programming_lang if programming_lang != "Select..." else "",
-                            years_experience=years_experience,
-                            auto_scoring=auto_scoring,
-                            auto_mobility=auto_mobility,
-                            auto_paths=auto_paths,
-                            can_climb=can_climb,
-                            can_intake_ground=can_intake_ground,
-                            can_intake_source=can_intake_source,
-                            can_shoot_speaker=can_shoot_speaker,
-                            can_score_amp=can_score_amp,
-                            has_vision=has_vision,
-                            strengths=strengths,
-                            weaknesses=weaknesses,
-                            strategy_notes=strategy_notes,
-                            scouter_name=scouter_name,
-                            robot_photo=photo_data,
-                            photo_filename=photo_filename
-                        )
-                        db.add(new_entry)
-                        db.commit()
-                        st.success(f"✅ Saved pit scouting data for Team {frc_team}!")
-                    st.session_state.pending_photo = None
-                    st.session_state.pending_photo_name = None
-                    if 'robot_photo' in st.session_state:
-                        del st.session_state['robot_photo']
-                    st.rerun()
-                finally:
-                    db.close()
+                queue_write('pit', session_id, {
+                    'frc_team': frc_team,
+                    'team_name': team_name,
+                    'drivetrain': drivetrain if drivetrain != "Select..." else "",
+                    'robot_weight': robot_weight,
+                    'robot_height': robot_height,
+                    'programming_lang': programming_lang if programming_lang != "Select..." else "",
+                    'years_experience': years_experience,
+                    'auto_scoring': auto_scoring,
+                    'auto_mobility': auto_mobility,
+                    'auto_paths': auto_paths,
+                    'can_climb': can_climb,
+                    'can_intake_ground': can_intake_ground,
+                    'can_intake_source': can_intake_source,
+                    'can_shoot_speaker': can_shoot_speaker,
+                    'can_score_amp': can_score_amp,
+                    'has_vision': has_vision,
+                    'strengths': strengths,
+                    'weaknesses': weaknesses,
+                    'strategy_notes': strategy_notes,
+                    'scouter_name': scouter_name,
+                    'robot_photo': st.session_state.pending_photo,
+                    'photo_filename': st.session_state.pending_photo_name
+                }, f"Saved pit scouting data for Team {frc_team}")
+                st.session_state.pending_photo = None
+                st.session_state.pending_photo_name = None
+                if 'robot_photo' in st.session_state:
+                    del st.session_state['robot_photo']
+                st.rerun()
 
 def match_scoring_page(session_id):
     """Match scoring interface."""
     st.markdown("### 🎯 Match Scoring")
     
-    schedule = get_match_schedule_data(session_id)
+    snapshot = get_session_snapshot(session_id)
+    schedule = snapshot.schedule
+    slot = None
     if schedule:
         st.markdown("#### Quick Select from Schedule")
         match_options = ["Select match..."] + [f"Match {m.match_number}" for m in schedule if not m.is_completed]
@@ -405,9 +504,15 @@ def match_scoring_page(session_id):
         
         if selected_match != "Select match...":
             match_num = int(selected_match.split(" ")[1])
-            match_data = next((m for m in schedule if m.match_number == match_num), None)
+            match_data = snapshot.schedule_by_match.get(match_num)
             if match_data:
-                st.info(f"🔴 Red: {match_data.red_1}, {match_data.red_2}, {match_data.red_3} | 🔵 Blue: {match_data.blue_1}, {match_data.blue_2}, {match_data.blue_3}")
+                red, blue = snapshot.match_alliances(match_data)
+                st.info(f"🔴 Red: {', '.join(red)} | 🔵 Blue: {', '.join(blue)}")
+                slot = st.selectbox(
+                    "Team to scout", [None, *snapshot.match_slots(match_data)],
+                    format_func=lambda s: "Select team..." if s is None else
+                        f"{'🔴' if s.alliance == 'Red' else '🔵'} {s.alliance} {s.station} - Team {s.frc_team}"
+                )
     
     st.markdown("---")
     st.markdown("Record team performance during matches.")
@@ -416,11 +521,11 @@ def match_scoring_page(session_id):
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            match_number = st.number_input("Match Number *", min_value=1, max_value=200, value=1)
+            match_number = st.number_input("Match Number *", min_value=1, max_value=200, value=slot.match_number if slot else 1)
         with col2:
-            frc_team = st.text_input("FRC Team Number *", placeholder="e.g., 254")
+            frc_team = st.text_input("FRC Team Number *", value=slot.frc_team if slot else "", placeholder="e.g., 254")
         with col3:
-            alliance = st.selectbox("Alliance", ["Red", "Blue"])
+            alliance = st.selectbox("Alliance", ["Red", "Blue"], index=1 if slot and slot.alliance == "Blue" else 0)
         
         st.markdown("#### Autonomous Period")
         col4, col5, col6 = st.columns(3)
@@ -483,35 +588,27 @@ def match_scoring_page(session_id):
             if not frc_team:
                 st.error("Please enter the FRC team number")
             else:
-                db = get_session()
-                try:
-                    new_match = MatchScore(
-                        session_id=session_id,
-                        match_number=match_number,
-                        frc_team=frc_team,
-                        alliance=alliance,
-                        auto_leave=auto_leave,
-                        auto_high=auto_high,
-                        auto_low=auto_low,
-                        teleop_high=teleop_high,
-                        teleop_low=teleop_low,
-                        teleop_cycles=teleop_cycles,
-                        endgame_status=endgame_status,
-                        trap_scored=trap_scored,
-                        defense_rating=defense_rating,
-                        driver_skill=driver_skill,
-                        died_on_field=died_on_field,
-                        tipped_over=tipped_over,
-                        exploded=exploded,
-                        match_notes=match_notes,
-                        scouter_name=scouter_name
-                    )
-                    db.add(new_match)
-                    db.commit()
-                    st.success(f"✅ Saved match {match_number} data for Team {frc_team}!")
-                    st.rerun()
-                finally:
-                    db.close()
+                queue_write('match', session_id, {
+                    'match_number': match_number,
+                    'frc_team': frc_team,
+                    'alliance': alliance,
+                    'auto_leave': auto_leave,
+                    'auto_high': auto_high,
+                    'auto_low': auto_low,
+                    'teleop_high': teleop_high,
+                    'teleop_low': teleop_low,
+                    'teleop_cycles': teleop_cycles,
+                    'endgame_status': endgame_status,
+                    'trap_scored': trap_scored,
+                    'defense_rating': defense_rating,
+                    'driver_skill': driver_skill,
+                    'died_on_field': died_on_field,
+                    'tipped_over': tipped_over,
+                    'exploded': exploded,
+                    'match_notes': match_notes,
+                    'scouter_name': scouter_name
+                }, f"Saved match {match_number} data for Team {frc_team}")
+                st.rerun()
 
 def match_schedule_page(session_id):
     """Match schedule management."""
@@ -547,30 +644,22 @@ def match_schedule_page(session_id):
             blue_3 = st.text_input("Blue 3", placeholder="Team #")
         
         if st.form_submit_button("➕ Add to Schedule", type="primary"):
-            db = get_session()
-            try:
-                new_match = MatchSchedule(
-                    session_id=session_id,
-                    match_number=match_number,
-                    match_type=match_type,
-                    red_1=red_1,
-                    red_2=red_2,
-                    red_3=red_3,
-                    blue_1=blue_1,
-                    blue_2=blue_2,
-                    blue_3=blue_3
-                )
-                db.add(new_match)
-                db.commit()
-                st.success(f"✅ Added Match {match_number} to schedule!")
-                st.rerun()
-            finally:
-                db.close()
+            queue_write('schedule', session_id, {
+                'match_number': match_number,
+                'match_type': match_type,
+                'red_1': red_1,
+                'red_2': red_2,
+                'red_3': red_3,
+                'blue_1': blue_1,
+                'blue_2': blue_2,
+                'blue_3': blue_3
+            }, f"Added Match {match_number} to schedule")
+            st.rerun()
     
     st.markdown("---")
     st.markdown("#### Current Schedule")
     
-    schedule = get_match_schedule_data(session_id)
+    schedule = get_session_snapshot(session_id).schedule
     if schedule:
         for match in schedule:
             status = "✅" if match.is_completed else "⏳"
@@ -583,15 +672,8 @@ def match_schedule_page(session_id):
                 
                 if not match.is_completed:
                     if st.button(f"Mark Complete", key=f"complete_{match.id}"):
-                        db = get_session()
-                        try:
-                            db_match = db.query(MatchSchedule).filter(MatchSchedule.id == match.id).first()
-                            if db_match:
-                                db_match.is_completed = True
-                                db.commit()
-                                st.rerun()
-                        finally:
-                            db.close()
+                        queue_write('complete', session_id, {'match_id': match.id}, f"Marked Match {match.match_number} complete")
+                        st.rerun()
     else:
         st.info("No matches scheduled yet. Add matches above!")
 
@@ -599,8 +681,9 @@ def dashboard_page(session_id):
     """View all scouting data."""
     st.markdown("### 📊 Scouting Dashboard")
     
-    pit_data = get_pit_scouting_data(session_id)
-    match_data = get_match_scores_data(session_id)
+    snapshot = get_session_snapshot(session_id)
+    pit_data = snapshot.pit
+    match_data = snapshot.matches
     
     col1, col2, col3 = st.columns(3)
     
@@ -609,38 +692,24 @@ def dashboard_page(session_id):
     with col2:
         st.metric("Matches Recorded", len(match_data))
     with col3:
-        unique_teams = len(set([m.frc_team for m in match_data]))
+        unique_teams = len(snapshot.matches_by_team)
         st.metric("Teams with Match Data", unique_teams)
     
     st.markdown("---")
     
     st.markdown("#### 📋 Pit Scouting Records")
     if pit_data:
-        for entry in pit_data:
-            with st.expander(f"Team {entry.frc_team} - {entry.team_name or 'Unknown'}"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    if entry.robot_photo:
-                        st.image(entry.robot_photo, caption=f"Team {entry.frc_team} Robot", use_container_width=True)
-                    
-                    st.write(f"**Drivetrain:** {entry.drivetrain or 'N/A'}")
-                    st.write(f"**Weight:** {entry.robot_weight or 'N/A'} lbs")
-                    st.write(f"**Height:** {entry.robot_height or 'N/A'} in")
-                    st.write(f"**Language:** {entry.programming_lang or 'N/A'}")
-                with col2:
-                    st.write(f"**Auto Scoring:** {'✅' if entry.auto_scoring else '❌'}")
-                    st.write(f"**Can Climb:** {'✅' if entry.can_climb else '❌'}")
-                    st.write(f"**Vision:** {'✅' if entry.has_vision else '❌'}")
-                    st.write(f"**Auto Paths:** {entry.auto_paths or 0}")
-                
-                if entry.strengths:
-                    st.write(f"**Strengths:** {entry.strengths}")
-                if entry.weaknesses:
-                    st.write(f"**Weaknesses:** {entry.weaknesses}")
-                if entry.strategy_notes:
-                    st.write(f"**Strategy:** {entry.strategy_notes}")
-                
-                st.caption(f"Scouted by: {entry.scouter_name or 'Unknown'}")
+        # One markdown element for all teams; each card is rebuilt only when its team's rows change.
+        st.markdown(''.join(pit_card(entry) for entry in pit_data), unsafe_allow_html=True)
+        
+        with_photos = [entry for entry in pit_data if entry.has_photo]
+        if with_photos:
+            shown = st.selectbox(
+                "📷 Robot photo", [None, *with_photos],
+                format_func=lambda p: "Select team..." if p is None else f"Team {p.frc_team} - {p.team_name or 'Unknown'}"
+            )
+            if shown:
+                show_robot_photo(shown, caption=f"Team {shown.frc_team} Robot", use_container_width=True)
     else:
         st.info("No pit scouting data yet. Start scouting teams!")
     
@@ -648,42 +717,12 @@ def dashboard_page(session_id):
     
     st.markdown("#### 🎯 Match Scores")
     if match_data:
-        sorted_matches = sorted(match_data, key=lambda x: (x.match_number, x.frc_team))
-        
-        for entry in sorted_matches:
-            alliance_color = "🔴" if entry.alliance == "Red" else "🔵"
-            with st.expander(f"Match {entry.match_number} - Team {entry.frc_team} {alliance_color}"):
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.write("**Autonomous:**")
-                    st.write(f"Left Zone: {'✅' if entry.auto_leave else '❌'}")
-                    st.write(f"High: {entry.auto_high or 0}")
-                    st.write(f"Low: {entry.auto_low or 0}")
-                
-                with col2:
-                    st.write("**Teleop:**")
-                    st.write(f"High: {entry.teleop_high or 0}")
-                    st.write(f"Low: {entry.teleop_low or 0}")
-                    st.write(f"Cycles: {entry.teleop_cycles or 0}")
-                
-                with col3:
-                    st.write("**Endgame:**")
-                    st.write(f"{entry.endgame_status or 'None'}")
-                    st.write(f"Defense: {'⭐' * (entry.defense_rating or 3)}")
-                    st.write(f"Skill: {'⭐' * (entry.driver_skill or 3)}")
-                
-                if entry.died_on_field:
-                    st.warning("⚠️ Robot died on field")
-                if entry.tipped_over:
-                    st.warning("⚠️ Robot tipped over")
-                if entry.exploded:
-                    st.warning("⚠️ Robot exploded")
-                
-                if entry.match_notes:
-                    st.write(f"**Notes:** {entry.match_notes}")
-                
-                st.caption(f"Scouted by: {entry.scouter_name or 'Unknown'}")
+        cards = []
+        for team in sorted(snapshot.matches_by_team, key=lambda t: (len(t.strip()), t.strip())):
+            entries = tuple(sorted(snapshot.team_matches(team), key=lambda m: (m.match_number, m.id)))
+            disputed = frozenset(c.match_number for c in snapshot.team_consensus(team) if c.disagreements)
+            cards.append(match_card(team.strip(), entries, disputed))
+        st.markdown(''.join(cards), unsafe_allow_html=True)
     else:
         st.info("No match data yet. Start recording matches!")
 
@@ -691,24 +730,26 @@ def search_page(session_id):
     """Search and filter scouting data."""
     st.markdown("### 🔍 Search & Filter")
     
-    pit_data = get_pit_scouting_data(session_id)
-    match_data = get_match_scores_data(session_id)
+    snapshot = get_session_snapshot(session_id)
+    pit_data = snapshot.pit
+    match_data = snapshot.matches
     
     search_team = st.text_input("Search by Team Number", placeholder="Enter team number...")
     
     if search_team:
         st.markdown("---")
         
-        pit_results = [p for p in pit_data if search_team in p.frc_team]
-        match_results = [m for m in match_data if search_team in m.frc_team]
+        found_teams = snapshot.search_teams(search_team)
+        pit_results = [snapshot.pit_by_team[t] for t in found_teams if t in snapshot.pit_by_team]
+        match_results = [m for t in found_teams for m in snapshot.team_consensus(t)]
         
         if pit_results:
             st.markdown(f"#### 📋 Pit Scouting for Team {search_team}")
             for entry in pit_results:
                 col1, col2 = st.columns([1, 2])
                 with col1:
-                    if entry.robot_photo:
-                        st.image(entry.robot_photo, use_container_width=True)
+                    if entry.has_photo:
+                        show_robot_photo(entry, use_container_width=True)
                 with col2:
                     st.write(f"**Team {entry.frc_team}** - {entry.team_name or 'Unknown'}")
                     st.write(f"Drivetrain: {entry.drivetrain or 'N/A'} | Weight: {entry.robot_weight or 'N/A'} lbs")
@@ -731,8 +772,19 @@ def search_page(session_id):
                     st.metric("Avg Low", f"{avg_low:.1f}")
                 with col4:
                     st.metric("Avg Cycles", f"{avg_cycles:.1f}")
+                
+                disputed = sum(1 for m in match_results if m.disagreements)
+                if disputed:
+                    st.caption(f"⚠️ Scouts disagreed on {disputed} of these matches; medians are used.")
+        
+        next_up = [(t, snapshot.next_match(t)) for t in found_teams]
+        next_up = [(t, slot) for t, slot in next_up if slot]
+        if next_up:
+            st.markdown("#### 📅 Next Matches")
+            for team, slot in next_up:
+                st.write(f"Team {team}: Match {slot.match_number} ({slot.alliance} {slot.station})")
         
-        if not pit_results and not match_results:
+        if not pit_results and not match_results and not next_up:
             st.info(f"No data found for team {search_team}")
     
     st.markdown("---")
@@ -765,8 +817,9 @@ def comparison_page(session_id):
     st.markdown("### ⚖️ Team Comparison")
     st.markdown("Select teams to compare their capabilities side-by-side.")
     
-    pit_data = get_pit_scouting_data(session_id)
-    match_data = get_match_scores_data(session_id)
+    snapshot = get_session_snapshot(session_id)
+    pit_data = snapshot.pit
+    match_data = snapshot.matches
     
     if not pit_data:
         st.info("No teams to compare. Add pit scouting data first!")
@@ -782,55 +835,131 @@ def comparison_page(session_id):
     
     if len(selected_teams) >= 2:
         selected_team_nums = [t.split(" - ")[0] for t in selected_teams]
+        trends = get_team_trends(session_id, get_data_version(session_id))
         
         cols = st.columns(len(selected_teams))
         
         for i, team_num in enumerate(selected_team_nums):
-            team_pit = next((p for p in pit_data if p.frc_team == team_num), None)
-            team_matches = [m for m in match_data if m.frc_team == team_num]
+            team_pit = snapshot.pit_by_team.get(team_num)
+            trend = None
+            if team_num in trends.index:
+                trend = tuple(trends.loc[team_num][['sparkline', 'ewma', 'slope', 'reliability', 'variance']])
             
             if team_pit:
                 with cols[i]:
-                    st.markdown(f"### Team {team_num}")
-                    st.markdown(f"**{team_pit.team_name or 'Unknown'}**")
-                    
-                    if team_pit.robot_photo:
-                        st.image(team_pit.robot_photo, use_container_width=True)
-                    
-                    st.markdown("---")
-                    st.markdown("**Specs:**")
-                    st.write(f"🔧 {team_pit.drivetrain or 'N/A'}")
-                    st.write(f"⚖️ {team_pit.robot_weight or 0} lbs")
-                    st.write(f"📏 {team_pit.robot_height or 0} in")
-                    
-                    st.markdown("---")
-                    st.markdown("**Capabilities:**")
-                    st.write(f"Auto Score: {'✅' if team_pit.auto_scoring else '❌'}")
-                    st.write(f"Climb: {'✅' if team_pit.can_climb else '❌'}")
-                    st.write(f"Vision: {'✅' if team_pit.has_vision else '❌'}")
-                    st.write(f"Auto Paths: {team_pit.auto_paths or 0}")
-                    
-                    if team_matches:
-                        st.markdown("---")
-                        st.markdown("**Match Stats:**")
-                        avg_high = sum((m.teleop_high or 0) + (m.auto_high or 0) for m in team_matches) / len(team_matches)
-                        avg_cycles = sum(m.teleop_cycles or 0 for m in team_matches) / len(team_matches)
-                        avg_skill = sum(m.driver_skill or 3 for m in team_matches) / len(team_matches)
-                        
-                        st.metric("Matches", len(team_matches))
-                        st.metric("Avg Scores", f"{avg_high:.1f}")
-                        st.metric("Avg Cycles", f"{avg_cycles:.1f}")
-                        st.metric("Avg Skill", f"{avg_skill:.1f}⭐")
+                    if team_pit.has_photo:
+                        show_robot_photo(team_pit, use_container_width=True)
+                    st.markdown(comparison_card(team_pit, snapshot.team_consensus(team_num), trend), unsafe_allow_html=True)
     elif len(selected_teams) == 1:
         st.warning("Select at least 2 teams to compare")
 
+def ratings_page(session_id):
+    """OPR/DPR/CCWM ratings for every team."""
+    import pandas as pd
+    from simulator import simulate_match
+    st.markdown("### 📈 Team Ratings")
+    st.markdown("Offensive (OPR), defensive (DPR) and winning-margin (CCWM) power ratings from fully scouted scheduled matches.")
+    
+    ratings = get_team_ratings(session_id, get_data_version(session_id))
+    
+    if ratings:
+        ratings_df = pd.DataFrame([{
+            'Team Number': team,
+            'OPR': r['opr'],
+            'DPR': r['dpr'],
+            'CCWM': r['ccwm']
+        } for team, r in ratings.items()]).sort_values('OPR', ascending=False)
+        
+        st.dataframe(ratings_df.round(2), use_container_width=True, hide_index=True)
+    else:
+        st.info("No ratings yet. Add the schedule and scout all six teams in a match!")
+    
+    st.markdown("---")
+    st.markdown("#### 🎲 Match Predictor")
+    
+    data_version = get_data_version(session_id)
+    profiles = get_team_profiles(session_id, data_version)
+    team_options = sorted(t for t in profiles if t != '*')
+    
+    if not team_options:
+        st.info("No match data yet. Start recording matches!")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        red = st.multiselect("🔴 Red Alliance", team_options, max_selections=3, key="predict_red")
+    with col2:
+        blue = st.multiselect("🔵 Blue Alliance", team_options, max_selections=3, key="predict_blue")
+    
+    if red and blue:
+        result = simulate_match(red, blue, profiles)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("🔴 Red Win", f"{result['red_win']:.0%}", f"{result['red_mean']:.0f} pts avg", delta_color="off")
+        with col2:
+            st.metric("Tie", f"{result['tie']:.0%}")
+        with col3:
+            st.metric("🔵 Blue Win", f"{result['blue_win']:.0%}", f"{result['blue_mean']:.0f} pts avg", delta_color="off")
+    
+    predictions = get_upcoming_predictions(session_id, data_version)
+    if predictions:
+        st.markdown("#### ⏳ Upcoming Matches")
+        st.dataframe(pd.DataFrame([{
+            'Match': number,
+            'Red': ", ".join(red),
+            'Blue': ", ".join(blue),
+            'Red Win %': round(r['red_win'] * 100),
+            'Blue Win %': round(r['blue_win'] * 100),
+            'Red Pts': round(r['red_mean']),
+            'Blue Pts': round(r['blue_mean'])
+        } for number, red, blue, r in predictions]), use_container_width=True, hide_index=True)
+
+def pick_list_page(session_id):
+    """Live ranked pick list for alliance selection."""
+    import pandas as pd
+    from picklist import METRICS, DEFAULT_WEIGHTS
+    st.markdown("### 🏆 Pick List")
+    st.markdown("Rank every team by your own weighting of their match stats.")
+    
+    pick_list = get_pick_list(session_id, get_data_version(session_id))
+    
+    if not pick_list.teams:
+        st.info("No match data yet. Start recording matches!")
+        return
+    
+    with st.expander("⚙️ Metric Weights"):
+        cols = st.columns(2)
+        weights = {}
+        for i, (name, label) in enumerate(METRICS.items()):
+            with cols[i % 2]:
+                weights[name] = st.slider(label, -2.0, 2.0, DEFAULT_WEIGHTS[name], 0.25, key=f"weight_{name}")
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        picked = st.multiselect("Already picked", pick_list.teams, key="picked_teams")
+    with col2:
+        top_k = st.number_input("Show top", min_value=1, max_value=len(pick_list.teams), value=min(24, len(pick_list.teams)))
+    
+    ranking = pick_list.top(weights, top_k, picked)
+    
+    pick_df = pd.DataFrame([{
+        'Rank': rank,
+        'Team Number': team,
+        'Score': round(score, 2),
+        **{label: round(value, 2) for label, value in zip(METRICS.values(), pick_list.row(team).values())}
+    } for rank, (team, score) in enumerate(ranking, 1)])
+    
+    st.dataframe(pick_df, use_container_width=True, hide_index=True)
+
 def export_page(session_id):
     """Export data to CSV/Excel."""
+    import pandas as pd
     st.markdown("### 📤 Export Data")
     st.markdown("Download your scouting data for analysis and sharing.")
     
-    pit_data = get_pit_scouting_data(session_id)
-    match_data = get_match_scores_data(session_id)
+    snapshot = get_session_snapshot(session_id)
+    pit_data = snapshot.pit
+    match_data = snapshot.matches
     
     col1, col2 = st.columns(2)
     
@@ -955,14 +1084,132 @@ def export_page(session_id):
             )
     else:
         st.info("No data to export. Start scouting first!")
+    
+    st.markdown("---")
+    st.markdown("#### 📦 Session Backup")
+    st.caption("A full copy of this session, photos included. Restore it on another server with `python backup.py import`.")
+    
+    if st.button("📦 Prepare Session Backup"):
+        with tempfile.TemporaryFile() as output:
+            db = read_session()
+            try:
+                write_backup(db, session_id, output)
+            finally:
+                db.close()
+            output.seek(0)
+            st.download_button(
+                label="📥 Click to Download Backup",
+                data=output.read(),
+                file_name=f"{st.session_state.team_code}_backup.zip",
+                mime="application/zip"
+            )
+
+def archived_session_page(session_id, archive_file):
+    """Read-only view of a session that has been moved to cold storage."""
+    import pandas as pd
+    
+    snapshot = get_archived_snapshot(archive_file, session_id)
+    st.info("📦 This session has been archived. Its data is read from cold storage and can't be edited until it is restored.")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Teams Scouted", len(snapshot.pit))
+    with col2:
+        st.metric("Match Entries", len(snapshot.matches))
+    with col3:
+        st.metric("Scheduled Matches", len(snapshot.schedule))
+    
+    team_tab, match_tab = st.tabs(["📋 Teams", "🎯 Matches"])
+    with team_tab:
+        st.dataframe(pd.DataFrame([{
+            'Team Number': p.frc_team,
+            'Team Name': p.team_name,
+            'Drivetrain': p.drivetrain,
+            'Can Climb': p.can_climb,
+            'Has Vision': p.has_vision,
+            'Strengths': p.strengths,
+            'Weaknesses': p.weaknesses,
+            'Scout': p.scouter_name
+        } for p in snapshot.pit]), use_container_width=True, hide_index=True)
+    with match_tab:
+        st.dataframe(pd.DataFrame([{
+            'Match': m.match_number,
+            'Team': m.frc_team,
+            'Alliance': m.alliance,
+            'Auto High': m.auto_high,
+            'Teleop High': m.teleop_high,
+            'Teleop Low': m.teleop_low,
+            'Cycles': m.teleop_cycles,
+            'Endgame': m.endgame_status,
+            'Notes': m.match_notes
+        } for m in snapshot.matches]), use_container_width=True, hide_index=True)
+    
+    if st.button("♻️ Restore Session", type="primary"):
+        db = get_session()
+        try:
+            restore_session(db, session_id)
+        finally:
+            db.close()
+        get_archive_file.clear()
+        st.rerun()
+
+def admin_page(session_id):
+    """Hidden performance panel, shown with ?admin=1 in the URL."""
+    import pandas as pd
+    st.markdown("### 🛠️ Performance")
+    
+    if not METRICS_ENABLED:
+        st.info("Instrumentation is off. Start the app with SCOUT_METRICS=1 to collect metrics.")
+        return
+    
+    stats = metrics.snapshot()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Reruns", stats['reruns'])
+    with col2:
+        st.metric("Avg Rerun", f"{stats['rerun_ms_avg']:.0f} ms")
+    with col3:
+        st.metric("SQL Statements", stats['sql_count'], f"{stats['sql_ms']:.0f} ms total", delta_color="off")
+    with col4:
+        st.metric("Image Bytes", f"{stats['image_bytes'] / 1e6:.1f} MB")
+    
+    st.markdown("#### Pages")
+    st.dataframe(pd.DataFrame([
+        {'Page': name, 'Renders': p['count'], 'Avg ms': p['ms_avg']} for name, p in stats['pages'].items()
+    ]), use_container_width=True, hide_index=True)
+    
+    st.markdown("#### Recent Reruns")
+    st.dataframe(pd.DataFrame([{
+        'Time': datetime.fromtimestamp(r['at']).strftime('%H:%M:%S'),
+        'Session': r['session_id'],
+        'ms': r['ms'],
+        'SQL': r['sql_count'],
+        'SQL ms': r['sql_ms'],
+        'Image Bytes': r['image_bytes']
+    } for r in reversed(stats['recent_reruns'])]), use_container_width=True, hide_index=True)
+    
+    st.markdown("#### Slow Queries")
+    if stats['slow_queries']:
+        st.dataframe(pd.DataFrame(reversed(stats['slow_queries'])), use_container_width=True, hide_index=True)
+    else:
+        st.info("No slow queries recorded.")
+    
+    st.download_button(
+        label="📥 Download Metrics JSON",
+        data=json.dumps(stats, indent=2),
+        file_name="scout_metrics.json",
+        mime="application/json"
+    )
 
 def main():
     init_session_state()
     
-    if st.session_state.team_code is None:
-        login_page()
-    else:
-        main_app()
+    with metrics.rerun(st.session_state.session_id):
+        if st.session_state.team_code is None:
+            login_page()
+        else:
+            main_app()
 
 if __name__ == "__main__":
     main()
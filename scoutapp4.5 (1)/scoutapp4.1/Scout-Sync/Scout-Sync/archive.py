@@ -0,0 +1,233 @@
+"""Cold storage for old and closed scouting sessions.
+
+Archiving writes a session to a compressed backup file (see backup.py) in
+ARCHIVE_DIR, then deletes its pit, match, schedule and change log rows, so
+the hot tables only hold active events. The ScoutingSession row stays, with
+a SessionArchive row naming the file, so the team code still resolves.
+Archived sessions are read straight from their file as a SessionSnapshot,
+or restored into the hot tables.
+
+    python archive.py run [--older-than-days 120] [--vacuum]
+    python archive.py close 6619a
+    python archive.py restore 6619a
+    python archive.py list
+"""
+import argparse
+import os
+import re
+import sys
+import zipfile
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, or_, select, text
+
+from backup import load_rows, read_backup, record_values, write_backup
+from models import (
+    ChangeLog, MatchSchedule, MatchScore, PitScouting, ScoutingSession, SessionArchive,
+    get_engine, get_session, init_db
+)
+from snapshot import MatchRecord, PitRecord, ScheduleRecord, SessionSnapshot, data_version
+
+ARCHIVE_DIR = os.environ.get('SCOUT_ARCHIVE_DIR') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'archive')
+DEFAULT_AGE = timedelta(days=120)
+
+HOT_TABLES = (PitScouting, MatchScore, MatchSchedule)
+
+def close_session(db, session_id):
+    """Mark a session closed so the next archive run moves it to cold storage."""
+    archive = db.get(SessionArchive, session_id) or SessionArchive(session_id=session_id)
+    archive.closed_at = archive.closed_at or datetime.utcnow()
+    db.add(archive)
+    db.commit()
+
+def archive_candidates(db, older_than):
+    """Return ids of unarchived sessions that are closed or idle since `older_than`."""
+    last_pit = select(PitScouting.session_id, func.max(PitScouting.timestamp).label('at')) \
+        .group_by(PitScouting.session_id).subquery()
+    last_match = select(MatchScore.session_id, func.max(MatchScore.timestamp).label('at')) \
+        .group_by(MatchScore.session_id).subquery()
+    rows = db.query(
+        ScoutingSession.id, ScoutingSession.created_at, last_pit.c.at, last_match.c.at,
+        SessionArchive.closed_at, SessionArchive.archived_at
+    ).outerjoin(last_pit, last_pit.c.session_id == ScoutingSession.id) \
+     .outerjoin(last_match, last_match.c.session_id == ScoutingSession.id) \
+     .outerjoin(SessionArchive, SessionArchive.session_id == ScoutingSession.id)
+    candidates = []
+    for session_id, created_at, pit_at, match_at, closed_at, archived_at in rows:
+        if archived_at is not None:
+            continue
+        last_active = max(t for t in (created_at, pit_at, match_at, datetime.min) if t is not None)
+        if closed_at is not None or last_active < older_than:
+            candidates.append(session_id)
+    return candidates
+
+def _hot_counts(db, session_id):
+    """Row counts of a session in each hot table, keyed by table name."""
+    return {
+        model.__tablename__: db.query(func.count(model.id)).filter(model.session_id == session_id).scalar()
+        for model in HOT_TABLES
+    }
+
+def _archived_rows(version):
+    """Each hot table's archived row count and the criteria matching just those rows.
+
+    Rows added after `version` have higher ids, and a pit row updated after
+    it has a later timestamp, so neither is matched.
+    """
+    return (
+        (PitScouting, version.pit_count, (
+            PitScouting.id <= version.pit_max_id,
+            or_(PitScouting.timestamp.is_(None), PitScouting.timestamp <= version.pit_updated),
+        )),
+        (MatchScore, version.match_count, (MatchScore.id <= version.match_max_id,)),
+        (MatchSchedule, version.schedule_count, (MatchSchedule.id <= version.schedule_max_id,)),
+    )
+
+def archive_session(db, session_id, archive_dir=ARCHIVE_DIR):
+    """Move one session's rows into an archive file and return its path.
+
+    The file is written, fsynced and read back before any row is deleted,
+    and only the rows it holds are deleted. If anything is written to the
+    session meanwhile, nothing is deleted and the file is removed.
+    """
+    session = db.get(ScoutingSession, session_id)
+    os.makedirs(archive_dir, exist_ok=True)
+    name = f"{re.sub(r'[^0-9A-Za-z_-]', '_', session.team_code)}-{session.id}.zip"
+    path = os.path.join(archive_dir, name)
+    partial = path + '.partial'
+    changed = ValueError(f"Session {session.team_code} changed while it was being archived")
+
+    version = data_version(db, session_id)
+    with open(partial, 'wb') as f:
+        write_backup(db, session_id, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+    with zipfile.ZipFile(partial) as zf:
+        archived = Counter(record['type'] for record in read_backup(zf))
+    if any(archived[model.__tablename__] != count for model, count, _ in _archived_rows(version)):
+        os.remove(partial)
+        raise changed
+    os.replace(partial, path)
+
+    try:
+        if data_version(db, session_id) != version:
+            raise changed
+        for model, count, criteria in _archived_rows(version):
+            if db.execute(delete(model).where(model.session_id == session_id, *criteria)).rowcount != count:
+                raise changed
+        # Anything left was written after the archive was taken.
+        if any(_hot_counts(db, session_id).values()):
+            raise changed
+        db.execute(delete(ChangeLog).where(ChangeLog.session_id == session_id))
+        archive = db.get(SessionArchive, session_id) or SessionArchive(session_id=session_id)
+        archive.archived_at = datetime.utcnow()
+        archive.path = name
+        archive.pit_rows = version.pit_count
+        archive.match_rows = version.match_count
+        archive.schedule_rows = version.schedule_count
+        archive.size_bytes = os.path.getsize(path)
+        db.add(archive)
+        db.commit()
+    except Exception:
+        db.rollback()
+        os.remove(path)
+        raise
+    return path
+
+def restore_session(db, session_id, archive_dir=ARCHIVE_DIR):
+    """Load an archived session back into the hot tables and reopen it."""
+    archive = db.get(SessionArchive, session_id)
+    if archive is None or archive.archived_at is None:
+        raise ValueError(f"Session {session_id} is not archived")
+    path = os.path.join(archive_dir, archive.path)
+    with zipfile.ZipFile(path) as zf:
+        records = read_backup(zf)
+        next(records)
+        load_rows(db, records, lambda r: zf.read(r['photo']), session_id)
+    db.delete(archive)
+    db.commit()
+    os.remove(path)
+
+def _archived_record(cls, model, record, row_id, session_id, **extra):
+    values = record_values(model, record)
+    values.update(id=row_id, session_id=session_id, **extra)
+    return cls(**{field: values.get(field) for field in cls._fields})
+
+def load_archived_snapshot(path, session_id=None):
+    """Read an archive file into a SessionSnapshot without touching the database.
+
+    Rows get ids in file order, and photos are not loaded.
+    """
+    pit, matches, schedule = [], [], []
+    with zipfile.ZipFile(path) as zf:
+        for row_id, record in enumerate(read_backup(zf)):
+            kind = record.get('type')
+            if kind == 'pit_scouting':
+                pit.append(_archived_record(PitRecord, PitScouting, record, row_id, session_id,
+                                            has_photo=bool(record.get('photo'))))
+            elif kind == 'match_scores':
+                matches.append(_archived_record(MatchRecord, MatchScore, record, row_id, session_id))
+            elif kind == 'match_schedule':
+                schedule.append(_archived_record(ScheduleRecord, MatchSchedule, record, row_id, session_id))
+    return SessionSnapshot(pit, matches, schedule)
+
+def vacuum():
+    """Return the space freed by archiving to the database."""
+    with get_engine().connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.execute(text("VACUUM"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old and closed sessions to cold storage.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help="archive closed sessions and those idle for too long")
+    run.add_argument('--older-than-days', type=float, default=DEFAULT_AGE.days)
+    run.add_argument('--vacuum', action='store_true', help="reclaim database space afterwards")
+    for command in ('close', 'restore'):
+        commands.add_parser(command).add_argument('team_code')
+    commands.add_parser('list', help="show archived and closed sessions")
+    args = parser.parse_args()
+
+    init_db()
+    db = get_session()
+    try:
+        if args.command == 'run':
+            older_than = datetime.utcnow() - timedelta(days=args.older_than_days)
+            for session_id in archive_candidates(db, older_than):
+                try:
+                    print(f"Archived session {session_id} to {archive_session(db, session_id)}")
+                except ValueError as e:
+                    db.rollback()
+                    print(f"Skipped session {session_id}: {e}")
+            if args.vacuum:
+                vacuum()
+        elif args.command == 'list':
+            rows = db.query(ScoutingSession.team_code, SessionArchive).join(
+                SessionArchive, SessionArchive.session_id == ScoutingSession.id)
+            for team_code, archive in rows:
+                if archive.archived_at:
+                    print(f"{team_code}: archived {archive.archived_at:%Y-%m-%d} to {archive.path} "
+                          f"({archive.pit_rows} pit, {archive.match_rows} match, {archive.schedule_rows} schedule rows, "
+                          f"{archive.size_bytes / 1e6:.1f} MB)")
+                else:
+                    print(f"{team_code}: closed {archive.closed_at:%Y-%m-%d}, not yet archived")
+        else:
+            session = db.query(ScoutingSession).filter(ScoutingSession.team_code == args.team_code.lower()).first()
+            if session is None:
+                sys.exit(f"No session with team code '{args.team_code}'")
+            if args.command == 'close':
+                close_session(db, session.id)
+                print(f"Closed {session.team_code}; the next archive run moves it to cold storage")
+            else:
+                try:
+                    restore_session(db, session.id)
+                except ValueError as e:
+                    sys.exit(str(e))
+                print(f"Restored {session.team_code}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
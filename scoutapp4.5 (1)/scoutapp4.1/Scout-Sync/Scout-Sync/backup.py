@@ -0,0 +1,216 @@
+"""Streaming session backups: compressed NDJSON records plus photo blobs.
+
+A backup is a zip file holding `records.ndjson` (deflated, one JSON record
+per line) and one stored `photos/<sha256>` member per distinct robot photo.
+The first record is a header, the second the session, then every schedule,
+pit scouting and match score row. Writing and reading both stream, so
+memory use stays flat regardless of event size.
+
+    python backup.py export 6619a 6619a.zip
+    python backup.py import 6619a.zip [--team-code 6619b]
+    python backup.py import-legacy scout_data/*.json
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import sys
+import zipfile
+from datetime import datetime
+
+from sqlalchemy import DateTime, insert
+
+from models import (
+    ScoutingSession, PitScouting, MatchScore, MatchSchedule, get_session, init_db, insert_schedule_slots
+)
+
+FORMAT = 'scout-session-backup'
+VERSION = 1
+RECORDS = 'records.ndjson'
+BATCH_SIZE = 1000
+
+TABLES = {
+    'match_schedule': MatchSchedule,
+    'pit_scouting': PitScouting,
+    'match_scores': MatchScore,
+}
+
+def _fields(model):
+    """Columns copied into a backup: everything but keys and the photo."""
+    return [c for c in model.__table__.columns if c.name not in ('id', 'session_id', 'robot_photo')]
+
+def _encode(value):
+    """Make a column value JSON-serializable."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def record_values(model, record):
+    """Turn a backup record back into column values for `model`."""
+    row = {}
+    for column in _fields(model):
+        if column.name not in record:
+            continue
+        value = record[column.name]
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        row[column.name] = value
+    return row
+
+def write_backup(db, session_id, fileobj):
+    """Stream one session into a backup zip written to `fileobj`."""
+    session = db.get(ScoutingSession, session_id)
+    if session is None:
+        raise ValueError(f"No scouting session with id {session_id}")
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        # A zip member must be finished before the next starts, so photos go
+        # first, remembered by pit row id, and records stream after them.
+        photos, written = {}, set()
+        rows = db.query(PitScouting.id, PitScouting.robot_photo).filter(
+            PitScouting.session_id == session_id, PitScouting.robot_photo.isnot(None))
+        for pit_id, photo in rows.yield_per(20):
+            name = f"photos/{hashlib.sha256(photo).hexdigest()}"
+            if name not in written:
+                # Photos are already compressed; store them as-is.
+                zf.writestr(zipfile.ZipInfo(name), photo, compress_type=zipfile.ZIP_STORED)
+                written.add(name)
+            photos[pit_id] = name
+
+        with zf.open(RECORDS, 'w', force_zip64=True) as raw, io.TextIOWrapper(raw, encoding='utf-8') as out:
+            def emit(record):
+                out.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+            emit({'type': 'header', 'format': FORMAT, 'version': VERSION})
+            emit({'type': 'session', 'team_code': session.team_code, 'created_at': _encode(session.created_at)})
+
+            for table, model in TABLES.items():
+                fields = _fields(model)
+                rows = db.query(model.id, *fields).filter(model.session_id == session_id).order_by(model.id)
+                for row_id, *values in rows.yield_per(BATCH_SIZE):
+                    record = {'type': table}
+                    record.update((c.name, _encode(v)) for c, v in zip(fields, values))
+                    if row_id in photos and model is PitScouting:
+                        record['photo'] = photos[row_id]
+                    emit(record)
+
+def read_backup(zf):
+    """Yield the records of an open backup zip, one line at a time."""
+    with zf.open(RECORDS) as raw:
+        lines = io.TextIOWrapper(raw, encoding='utf-8')
+        header = json.loads(next(lines))
+        if header.get('format') != FORMAT or header.get('version', 0) > VERSION:
+            raise ValueError(f"Not a supported backup: {header}")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+def load_rows(db, records, load_photo, session_id, batch_size=BATCH_SIZE):
+    """Bulk-insert a stream of row records into an existing session.
+
+    Rows are inserted in batches of `batch_size` per table; the caller commits.
+    """
+    batches = {table: [] for table in TABLES}
+
+    def flush(table):
+        if batches[table]:
+            db.execute(insert(TABLES[table]), batches[table])
+            batches[table] = []
+
+    for record in records:
+        table = record.get('type')
+        if table not in TABLES:
+            continue
+        row = record_values(TABLES[table], record)
+        row['session_id'] = session_id
+        if table == 'pit_scouting':
+            row['robot_photo'] = load_photo(record) if record.get('photo') else None
+        batches[table].append(row)
+        if len(batches[table]) >= batch_size:
+            flush(table)
+    for table in TABLES:
+        flush(table)
+    insert_schedule_slots(db, MatchSchedule.session_id == session_id)
+
+def import_records(db, records, load_photo, team_code=None, batch_size=BATCH_SIZE):
+    """Bulk-load a stream of records into a new session and return its id.
+
+    The first record must be the session; `team_code` renames it on import.
+    """
+    first = next(records)
+    if first.get('type') != 'session':
+        raise ValueError("Backup does not start with a session record")
+    code = (team_code or first['team_code']).lower()
+    if db.query(ScoutingSession.id).filter(ScoutingSession.team_code == code).first():
+        raise ValueError(f"A session with team code '{code}' already exists")
+
+    created_at = datetime.fromisoformat(first['created_at']) if first.get('created_at') else datetime.utcnow()
+    session = ScoutingSession(team_code=code, created_at=created_at)
+    db.add(session)
+    db.flush()
+    load_rows(db, records, load_photo, session.id, batch_size)
+    db.commit()
+    return session.id
+
+def import_backup(db, fileobj, team_code=None):
+    """Import a backup zip as a new session and return its id."""
+    with zipfile.ZipFile(fileobj) as zf:
+        return import_records(db, read_backup(zf), lambda r: zf.read(r['photo']), team_code)
+
+def legacy_records(path):
+    """Yield records from an old scout_data/<team_code>.json dump."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    yield {'type': 'session', 'team_code': data['team_code'], 'created_at': data.get('created_at')}
+    for table in ('pit_scouting', 'match_scores'):
+        for row in data.get(table) or []:
+            record = {'type': table, **row}
+            if row.get('robot_photo'):
+                record['photo'] = row['robot_photo']
+            yield record
+
+def import_legacy(db, path, team_code=None):
+    """Import an old scout_data JSON dump as a new session and return its id."""
+    return import_records(db, legacy_records(path), lambda r: base64.b64decode(r['photo']), team_code)
+
+def main():
+    parser = argparse.ArgumentParser(description="Back up and restore scouting sessions.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help="write a session to a backup zip")
+    export.add_argument('team_code')
+    export.add_argument('output')
+    restore = commands.add_parser('import', help="load a backup zip as a new session")
+    restore.add_argument('input')
+    restore.add_argument('--team-code', help="import under a different team code")
+    legacy = commands.add_parser('import-legacy', help="load old scout_data/*.json dumps")
+    legacy.add_argument('inputs', nargs='+')
+    args = parser.parse_args()
+
+    init_db()
+    db = get_session()
+    try:
+        if args.command == 'export':
+            session = db.query(ScoutingSession).filter(ScoutingSession.team_code == args.team_code.lower()).first()
+            if session is None:
+                sys.exit(f"No session with team code '{args.team_code}'")
+            with open(args.output, 'wb') as f:
+                write_backup(db, session.id, f)
+            print(f"Wrote {args.output}")
+        elif args.command == 'import':
+            with open(args.input, 'rb') as f:
+                try:
+                    session_id = import_backup(db, f, args.team_code)
+                except ValueError as e:
+                    sys.exit(str(e))
+            print(f"Imported {args.input} as session {session_id}")
+        else:
+            for path in args.inputs:
+                try:
+                    session_id = import_legacy(db, path)
+                    print(f"Imported {path} as session {session_id}")
+                except ValueError as e:
+                    db.rollback()
+                    print(f"Skipped {path}: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
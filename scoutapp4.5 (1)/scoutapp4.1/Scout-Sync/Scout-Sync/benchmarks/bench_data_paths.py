@@ -0,0 +1,205 @@
+"""Benchmark the data and rendering paths behind the main pages.
+
+Generates deterministic synthetic events, then reports wall time, SQL
+statement count and time, and peak Python memory for each data path and
+for rendering dashboard_page, search_page, comparison_page and export_page.
+
+    python benchmarks/bench_data_paths.py
+    python benchmarks/bench_data_paths.py --sizes small --database-url postgresql://localhost/scout_bench
+
+Without --database-url a throwaway SQLite file is used.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from synthetic import EVENT_SIZES, generate_event
+
+class QueryCounter:
+    """Counts and times every SQL statement run by any engine."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        event.listen(Engine, 'before_cursor_execute', self._before)
+        event.listen(Engine, 'after_cursor_execute', self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info['bench_start'] = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.seconds += time.perf_counter() - conn.info.pop('bench_start', time.perf_counter())
+
+    def reset(self):
+        self.count = 0
+        self.seconds = 0.0
+
+def measure(counter, label, fn):
+    """Run fn once and return its timing, query and memory figures."""
+    counter.reset()
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    wall = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'path': label,
+        'wall_ms': round(wall * 1000, 1),
+        'queries': counter.count,
+        'sql_ms': round(counter.seconds * 1000, 1),
+        'peak_kb': round(peak / 1024),
+    }
+
+def data_paths(session_id):
+    """Return (label, fn) pairs for the data paths the pages depend on."""
+    from models import get_session
+    from picklist import DEFAULT_WEIGHTS, PickList, team_stats
+    from ratings import RatingEngine, alliance_scores
+    from snapshot import SnapshotCache, data_version, load_photo, load_snapshot
+    from trends import team_trends
+
+    db = get_session()
+    snapshot = load_snapshot(db, session_id)
+    cache = SnapshotCache(session_id)
+    cache.get(db, data_version(db, session_id))
+
+    def delta_refresh():
+        cache.version = None
+        return cache.get(db, data_version(db, session_id))
+
+    def ratings():
+        engine = RatingEngine()
+        return engine.rate(alliance_scores(snapshot.alliances(), snapshot.consensus))
+
+    return [
+        ("data version", lambda: data_version(db, session_id)),
+        ("snapshot full load", lambda: load_snapshot(db, session_id)),
+        ("snapshot delta refresh", delta_refresh),
+        ("all robot photos", lambda: [load_photo(db, p.id) for p in snapshot.pit if p.has_photo]),
+        ("ratings", ratings),
+        ("trends", lambda: team_trends(snapshot.consensus)),
+        ("pick list top 24", lambda: PickList(*team_stats(snapshot.consensus, ratings())).top(DEFAULT_WEIGHTS, 24)),
+    ]
+
+def _render(app_dir, page, session_id):
+    """AppTest script: render a single page of the app."""
+    import sys
+    sys.path.insert(0, app_dir)
+    import app
+    getattr(app, page)(session_id)
+
+def _search(at, teams):
+    next(t for t in at.text_input if t.label == "Search by Team Number").input(teams[0])
+
+def _compare(at, teams):
+    select = at.multiselect[0]
+    select.set_value(select.options[:4])
+
+def _export(at, teams):
+    next(b for b in at.button if b.label.startswith("📥 Download Full Report")).click()
+
+def _run(at):
+    """Run an AppTest and fail loudly if the page raised."""
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+PAGES = [
+    ('dashboard_page', None),
+    ('search_page', _search),
+    ('comparison_page', _compare),
+    ('export_page', _export),
+]
+
+def render_paths(session_id, teams):
+    """Return (label, fn) pairs rendering each page cold, interacting, then warm."""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    paths = []
+    for page, interact in PAGES:
+        at = AppTest.from_function(_render, args=(APP_DIR, page, session_id), default_timeout=600)
+
+        def cold(at=at):
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            _run(at)
+
+        def interacted(at=at, interact=interact):
+            interact(at, teams)
+            _run(at)
+
+        paths.append((f"{page} cold", cold))
+        if interact:
+            paths.append((f"{page} interact", interacted))
+        paths.append((f"{page} warm", lambda at=at: _run(at)))
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', choices=EVENT_SIZES, default=list(EVENT_SIZES))
+    parser.add_argument('--database-url', help="defaults to a temporary SQLite file")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-photos', action='store_true')
+    parser.add_argument('--no-render', action='store_true', help="skip the page rendering paths")
+    parser.add_argument('--json', help="also write results to this file")
+    args = parser.parse_args()
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+    from models import PitScouting, ScoutingSession, get_session, init_db
+    init_db()
+    counter = QueryCounter()
+
+    results = []
+    for size in args.sizes:
+        teams, matches = EVENT_SIZES[size]
+        team_code = f"bench-{size}-{args.seed}{'-np' if args.no_photos else ''}"
+        db = get_session()
+        try:
+            existing = db.query(ScoutingSession).filter(ScoutingSession.team_code == team_code).first()
+            if existing:
+                session_id = existing.id
+            else:
+                start = time.perf_counter()
+                session_id = generate_event(db, team_code, teams, matches, args.seed, not args.no_photos)
+                print(f"generated {size} event ({teams} teams, {matches} matches) in {time.perf_counter() - start:.1f}s")
+            team_numbers = [team for team, in db.query(PitScouting.frc_team).filter(PitScouting.session_id == session_id)]
+        finally:
+            db.close()
+
+        paths = data_paths(session_id)
+        if not args.no_render:
+            paths += render_paths(session_id, team_numbers)
+
+        print(f"\n== {size}: {teams} teams, {matches} matches ==")
+        print(f"{'path':<32}{'wall ms':>10}{'queries':>9}{'sql ms':>9}{'peak KB':>10}")
+        for label, fn in paths:
+            row = measure(counter, label, fn)
+            row['size'] = size
+            results.append(row)
+            print(f"{row['path']:<32}{row['wall_ms']:>10}{row['queries']:>9}{row['sql_ms']:>9}{row['peak_kb']:>10}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Benchmark server start-up: import time and first-render time of app.py.
+
+Every measurement starts a fresh Python process, so nothing is already
+imported. A run reports the time to import app.py's top-level modules, to
+render the login page, and to render the main app after logging in to a
+synthetic event, plus which heavy libraries the login page pulled in.
+
+    python benchmarks/bench_startup.py --save-baseline startup.json
+    python benchmarks/bench_startup.py --baseline startup.json
+
+With --baseline the script exits non-zero if any median is more than
+--tolerance slower than the baseline, or if the login page imports one of
+HEAVY_MODULES.
+"""
+import argparse
+import ast
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(APP_DIR, 'app.py')
+sys.path.insert(0, APP_DIR)
+
+# Libraries that must stay out of start-up and the login page.
+HEAVY_MODULES = ['pandas', 'numpy', 'scipy', 'openpyxl']
+STEPS = ['import_ms', 'login_page_ms', 'first_page_ms']
+# Differences below this are noise on any machine, whatever the tolerance.
+NOISE_MS = 50
+RUN_TIMEOUT = 120
+
+def top_level_imports(path):
+    """Return the modules imported at the top level of a script."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return modules
+
+def measure_imports():
+    """Time importing app.py's top-level modules in a cold process."""
+    start = time.perf_counter()
+    for module in top_level_imports(APP_PATH):
+        importlib.import_module(module)
+    return {'import_ms': (time.perf_counter() - start) * 1000}
+
+def measure_renders(team_code):
+    """Time the login page and the first page after login in a cold process.
+
+    Imports happen inside the script run here, as on a freshly started server.
+    Times include AppTest's own overhead, which is steady between runs, so
+    compare them with a baseline from the same machine rather than a server.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH)
+    start = time.perf_counter()
+    at.run(timeout=RUN_TIMEOUT)
+    result = {'login_page_ms': (time.perf_counter() - start) * 1000}
+    result['heavy_on_login'] = [m for m in HEAVY_MODULES if m in sys.modules]
+
+    at.text_input[0].input(team_code)
+    start = time.perf_counter()
+    at.button[0].click().run(timeout=RUN_TIMEOUT)
+    result['first_page_ms'] = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return result
+
+def cold_run(*child_args):
+    """Run this script in a fresh interpreter and return its JSON result."""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', *child_args],
+        capture_output=True, text=True, check=True, env=os.environ,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--database-url', help="defaults to a temporary SQLite file")
+    parser.add_argument('--baseline', help="fail if slower than the medians in this file")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown against the baseline")
+    parser.add_argument('--save-baseline', help="write the medians to this file")
+    parser.add_argument('--child', nargs='+', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        step, *rest = args.child
+        print(json.dumps(measure_imports() if step == 'imports' else measure_renders(*rest)))
+        return
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/startup.db"
+    # Keep benchmark writes out of the app's own journal.
+    os.environ['SCOUT_JOURNAL_DIR'] = tempfile.mkdtemp()
+
+    from models import ScoutingSession, get_session, init_db
+    from synthetic import EVENT_SIZES, generate_event
+    init_db()
+    team_code = 'bench-startup'
+    db = get_session()
+    try:
+        if not db.query(ScoutingSession).filter(ScoutingSession.team_code == team_code).first():
+            generate_event(db, team_code, *EVENT_SIZES['small'], photos=False)
+    finally:
+        db.close()
+
+    runs = []
+    for _ in range(args.runs):
+        runs.append({**cold_run('imports'), **cold_run('renders', team_code)})
+
+    medians = {step: round(statistics.median(r[step] for r in runs), 1) for step in STEPS}
+    heavy = sorted({m for r in runs for m in r['heavy_on_login']})
+    print(f"{'step':<16}{'median ms':>11}{'min ms':>9}{'max ms':>9}")
+    for step in STEPS:
+        values = [r[step] for r in runs]
+        print(f"{step:<16}{medians[step]:>11.0f}{min(values):>9.0f}{max(values):>9.0f}")
+    print(f"heavy modules on login page: {', '.join(heavy) or 'none'}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(medians, f, indent=2)
+
+    failures = [f"login page imported {', '.join(heavy)}"] if heavy else []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for step in STEPS:
+            limit = max(baseline[step] * (1 + args.tolerance), baseline[step] + NOISE_MS)
+            if medians[step] > limit:
+                failures.append(f"{step} {medians[step]:.0f} ms > {limit:.0f} ms (baseline {baseline[step]:.0f} ms)")
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Load-test app.py with many scouts submitting at the end of each match.
+
+Every simulated scout is an AppTest session of the real app.py in its own
+process (AppTest keeps global runtime state, so sessions cannot share one).
+Each scout logs in, then for every match waits at a barrier (the final
+buzzer), submits the match scoring form and views the refreshed dashboard.
+Reports latency percentiles per step, submit throughput and connection
+pressure, including server-side connections on Postgres.
+
+    python benchmarks/load_test.py --scouts 30 --matches 5
+    python benchmarks/load_test.py --size regional --database-url postgresql://localhost/scout_load
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(APP_DIR, 'app.py')
+sys.path.insert(0, APP_DIR)
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import Pool
+
+from synthetic import EVENT_SIZES, generate_event
+
+class PoolMonitor:
+    """Tracks DBAPI connections opened and the peak number checked out."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        event.listen(Pool, 'connect', self._connect)
+        event.listen(Pool, 'checkout', self._checkout)
+        event.listen(Pool, 'checkin', self._checkin)
+
+    def _connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.opened += 1
+
+    def _checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checked_out -= 1
+
+class Scout:
+    """One simulated scout driving its own app session."""
+
+    def __init__(self, number, team_code, timings, timeout):
+        self.number = number
+        self.team_code = team_code
+        self.timings = timings
+        self.rng = random.Random(number)
+        self.at = None
+        self.timeout = timeout
+
+    def _timed(self, step, fn):
+        start = time.time()
+        fn()
+        self.timings[step].append((start, time.time()))
+        if self.at.exception:
+            raise RuntimeError(f"scout {self.number} {step}: {self.at.exception[0].value}")
+
+    def login(self):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(APP_PATH, default_timeout=self.timeout)
+        self._timed('open', self.at.run)
+        self.at.text_input[0].input(self.team_code)
+        self._timed('login', self.at.button[0].click().run)
+
+    def submit(self, match_number, team):
+        at = self.at
+        form = 'match_scoring_form'
+        number_inputs = {w.label: w for w in at.number_input if w.form_id == form}
+        text_inputs = {w.label: w for w in at.text_input if w.form_id == form}
+        number_inputs["Match Number *"].set_value(match_number)
+        text_inputs["FRC Team Number *"].input(team)
+        number_inputs["Auto High Scores"].set_value(self.rng.randint(0, 4))
+        number_inputs["Teleop High Scores"].set_value(self.rng.randint(0, 15))
+        number_inputs["Teleop Low Scores"].set_value(self.rng.randint(0, 6))
+        number_inputs["Total Cycles"].set_value(self.rng.randint(0, 12))
+        text_inputs["Your Name (Scout)"].input(f"Load Scout {self.number}")
+        button = next(b for b in at.button if b.form_id == form)
+        self._timed('submit', button.click().run)
+
+    def view_dashboard(self):
+        self._timed('dashboard', self.at.run)
+
+def run_scout(number, team_code, alliances, timeout, buzzer, results):
+    """Process entry point: drive one scout and report its timings."""
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    monitor = PoolMonitor()
+    timings = defaultdict(list)
+    scout = Scout(number, team_code, timings, timeout)
+    try:
+        scout.login()
+        for i, six in enumerate(alliances):
+            buzzer.wait()
+            scout.submit(1000 + i, six[number % 6])
+            scout.view_dashboard()
+        results.put((number, dict(timings), monitor.opened, monitor.peak_checked_out, None))
+    except Exception as e:
+        # Release everyone else waiting on the buzzer.
+        buzzer.abort()
+        results.put((number, dict(timings), monitor.opened, monitor.peak_checked_out, repr(e)))
+
+def sample_server_connections(database_url, stop, peak):
+    """Track the peak number of server connections on Postgres."""
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        while not stop.is_set():
+            count = conn.execute(text("SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()")).scalar()
+            peak[0] = max(peak[0], count)
+            stop.wait(0.1)
+    engine.dispose()
+
+def percentiles(values):
+    """Return p50/p90/p99/max in milliseconds."""
+    if len(values) < 2:
+        values = values * 2 or [0.0, 0.0]
+    q = statistics.quantiles(values, n=100, method='inclusive')
+    return q[49] * 1000, q[89] * 1000, q[98] * 1000, max(values) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scouts', type=int, default=30)
+    parser.add_argument('--matches', type=int, default=3, help="end-of-match bursts to simulate")
+    parser.add_argument('--size', choices=['empty'] + list(EVENT_SIZES), default='small',
+                        help="synthetic event to pre-load before the burst")
+    parser.add_argument('--database-url', help="defaults to a temporary SQLite file")
+    parser.add_argument('--timeout', type=float, default=300)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/load.db"
+    # Keep benchmark writes out of the app's own journal.
+    os.environ['SCOUT_JOURNAL_DIR'] = tempfile.mkdtemp()
+    database_url = os.environ['DATABASE_URL']
+
+    from models import PitScouting, ScoutingSession, get_session, init_db
+    init_db()
+
+    team_code = f"load-{int(time.time())}"
+    db = get_session()
+    try:
+        if args.size == 'empty':
+            db.add(ScoutingSession(team_code=team_code))
+            db.commit()
+            teams = [str(n) for n in range(1, 61)]
+        else:
+            n_teams, n_matches = EVENT_SIZES[args.size]
+            session_id = generate_event(db, team_code, n_teams, n_matches, photos=False)
+            teams = [t for t, in db.query(PitScouting.frc_team).filter(PitScouting.session_id == session_id)]
+    finally:
+        db.close()
+
+    rng = random.Random(0)
+    alliances = [rng.sample(teams, 6) for _ in range(args.matches)]
+
+    ctx = multiprocessing.get_context('spawn')
+    buzzer = ctx.Barrier(args.scouts)
+    results = ctx.Queue()
+    stop, server_peak = threading.Event(), [0]
+    if database_url.startswith('postgresql'):
+        threading.Thread(target=sample_server_connections, args=(database_url, stop, server_peak), daemon=True).start()
+
+    start = time.time()
+    processes = [
+        ctx.Process(target=run_scout, args=(i, team_code, alliances, args.timeout, buzzer, results))
+        for i in range(args.scouts)
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    total = time.time() - start
+    stop.set()
+
+    errors = [(number, error) for number, _, _, _, error in reports if error]
+    for number, error in errors:
+        print(f"scout {number} failed: {error}")
+
+    steps = defaultdict(list)
+    for _, timings, _, _, _ in reports:
+        for step, spans in timings.items():
+            steps[step].extend(spans)
+
+    print(f"\n{args.scouts} scouts x {args.matches} matches on {args.size} event ({database_url.split(':')[0]})")
+    print(f"{'step':<12}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for step in ('open', 'login', 'submit', 'dashboard'):
+        p50, p90, p99, worst = percentiles([end - begin for begin, end in steps[step]])
+        print(f"{step:<12}{len(steps[step]):>7}{p50:>10.0f}{p90:>10.0f}{p99:>10.0f}{worst:>10.0f}")
+
+    # Submits are sorted by start time; each burst is one submit per scout.
+    submits = sorted(steps['submit'])
+    bursts = [submits[i:i + args.scouts] for i in range(0, len(submits), args.scouts)]
+    windows = [max(end for _, end in burst) - min(begin for begin, _ in burst) for burst in bursts if burst]
+    if windows:
+        print(f"\nsubmit throughput: {args.scouts / statistics.mean(windows):.1f}/s per burst "
+              f"(bursts took {', '.join(f'{w:.2f}s' for w in windows)})")
+    print(f"total wall time: {total:.1f}s")
+    print(f"client connections opened: {sum(r[2] for r in reports)}, "
+          f"peak checked out per scout: {max(r[3] for r in reports)}")
+    if server_peak[0]:
+        print(f"peak server connections: {server_peak[0]}")
+    if errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
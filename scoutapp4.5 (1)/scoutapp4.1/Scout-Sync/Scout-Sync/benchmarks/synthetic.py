@@ -0,0 +1,127 @@
+"""Deterministic synthetic FRC events for benchmarking."""
+import io
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import ScoutingSession, PitScouting, MatchScore, MatchSchedule, insert_schedule_slots
+
+# (teams, qualification matches) for small, regional and championship-sized events.
+EVENT_SIZES = {
+    'small': (40, 80),
+    'regional': (70, 110),
+    'championship': (150, 130),
+}
+
+DRIVETRAINS = ["Tank/West Coast", "Swerve", "Swerve", "Swerve", "Mecanum"]
+LANGUAGES = ["Java", "Java", "C++", "Python", "LabVIEW"]
+ENDGAMES = ["None", "Parked", "Climbed - Low", "Climbed - Mid", "Climbed - High", "Harmony Bonus"]
+# Noise compresses badly, so these land around 150-400 KB like a phone photo.
+PHOTO_DIMENSIONS = [(480, 360), (640, 480), (800, 600)]
+# Rows are timestamped as if scouted over the event, one pit visit or one
+# match at a time, ending now. The snapshot's clock-skew window then covers
+# only the last match, as at a real event, rather than every generated row.
+PIT_INTERVAL = timedelta(minutes=5)
+MATCH_INTERVAL = timedelta(minutes=7)
+
+def _photo(rng):
+    """Return a JPEG of noise, about the size of a resized phone photo.
+
+    Needs Pillow, which is only required when photos are generated.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("Generating robot photos needs Pillow; install it or pass photos=False (--no-photos)")
+    width, height = rng.choice(PHOTO_DIMENSIONS)
+    image = Image.frombytes('RGB', (width, height), rng.randbytes(width * height * 3))
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=60)
+    return output.getvalue()
+
+def generate_event(db, team_code, teams=70, matches=110, seed=0, photos=True):
+    """Create a fully scouted event and return its session id.
+
+    Every team gets a pit record (with a photo when `photos` is set), every
+    qualification match is scheduled, and each of its six robots is scored
+    by one scout. Team skill is fixed per team so ratings are meaningful.
+    Rows are timestamped a pit visit or a match apart, ending now.
+    """
+    rng = random.Random(seed)
+    scouted_at = datetime.utcnow() - teams * PIT_INTERVAL - matches * MATCH_INTERVAL
+    session = ScoutingSession(team_code=team_code)
+    db.add(session)
+    db.flush()
+
+    numbers = [str(n) for n in rng.sample(range(1, 10000), teams)]
+    skill = {team: rng.uniform(0.2, 1.0) for team in numbers}
+
+    for team in numbers:
+        db.add(PitScouting(
+            session_id=session.id,
+            frc_team=team,
+            team_name=f"Team {team}",
+            drivetrain=rng.choice(DRIVETRAINS),
+            robot_weight=rng.randint(90, 125),
+            robot_height=rng.randint(20, 48),
+            programming_lang=rng.choice(LANGUAGES),
+            years_experience=rng.randint(1, 25),
+            auto_scoring=rng.random() < skill[team],
+            auto_mobility=rng.random() < 0.9,
+            auto_paths=rng.randint(0, 6),
+            can_climb=rng.random() < skill[team],
+            can_intake_ground=rng.random() < 0.8,
+            can_intake_source=rng.random() < 0.7,
+            can_shoot_speaker=rng.random() < skill[team],
+            can_score_amp=rng.random() < 0.6,
+            has_vision=rng.random() < skill[team],
+            strengths="Fast cycles, consistent auto",
+            weaknesses="Struggles under defense",
+            strategy_notes="Feed notes from the source side",
+            scouter_name=f"Pit Scout {rng.randint(1, 4)}",
+            robot_photo=_photo(rng) if photos else None,
+            photo_filename=f"{team}.jpg" if photos else None,
+            timestamp=scouted_at,
+        ))
+        scouted_at += PIT_INTERVAL
+
+    for number in range(1, matches + 1):
+        scouted_at += MATCH_INTERVAL
+        six = rng.sample(numbers, 6)
+        db.add(MatchSchedule(
+            session_id=session.id,
+            match_number=number,
+            red_1=six[0], red_2=six[1], red_3=six[2],
+            blue_1=six[3], blue_2=six[4], blue_3=six[5],
+            is_completed=True,
+        ))
+        for slot, team in enumerate(six):
+            s = skill[team]
+            db.add(MatchScore(
+                session_id=session.id,
+                match_number=number,
+                frc_team=team,
+                alliance="Red" if slot < 3 else "Blue",
+                auto_leave=rng.random() < 0.5 + s / 2,
+                auto_high=max(0, int(rng.gauss(3 * s, 1))) if s > 0.3 else 0,
+                auto_low=rng.randint(0, 1),
+                teleop_high=max(0, int(rng.gauss(12 * s, 3))),
+                teleop_low=max(0, int(rng.gauss(4 * s, 2))),
+                teleop_cycles=max(0, int(rng.gauss(10 * s, 2))),
+                endgame_status=ENDGAMES[min(len(ENDGAMES) - 1, int(rng.random() * s * len(ENDGAMES)))],
+                trap_scored=rng.random() < s / 5,
+                defense_rating=rng.randint(1, 5),
+                driver_skill=max(1, min(5, round(s * 5))),
+                died_on_field=rng.random() < 0.05,
+                tipped_over=rng.random() < 0.02,
+                match_notes="",
+                scouter_name=f"Scout {slot + 1}",
+                timestamp=scouted_at,
+            ))
+    db.flush()
+    insert_schedule_slots(db, MatchSchedule.session_id == session.id)
+    db.commit()
+    return session.id
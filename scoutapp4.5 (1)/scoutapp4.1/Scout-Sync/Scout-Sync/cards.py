@@ -0,0 +1,113 @@
+"""Team cards for the dashboard and comparison pages, rendered as HTML.
+
+Each card is built once from a team's record tuples and memoized on them.
+Records carry their ids and timestamps, so a card is only rebuilt when
+that team's rows change, and a page emits all its cards as one markdown
+element instead of dozens of widgets per team.
+"""
+import html
+from functools import lru_cache
+
+CACHE_SIZE = 1024
+
+STAT_STYLE = "font-size:1.5em;font-weight:600"
+
+def _text(value, default='N/A'):
+    """Escape a user-entered value for HTML, with a default for blanks."""
+    return default if value is None or value == '' else html.escape(str(value))
+
+def _check(flag):
+    return '✅' if flag else '❌'
+
+def _stars(rating):
+    return '⭐' * round(rating or 3)
+
+def _notes(*labelled):
+    return ''.join(f"<p><b>{label}:</b> {html.escape(value)}</p>" for label, value in labelled if value)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def pit_card(entry):
+    """Collapsible pit scouting card for one team."""
+    photo = " 📷" if entry.has_photo else ""
+    return (
+        f"<details><summary>Team {_text(entry.frc_team)} - {_text(entry.team_name, 'Unknown')}{photo}</summary>"
+        "<table>"
+        f"<tr><td><b>Drivetrain:</b> {_text(entry.drivetrain)}</td><td><b>Auto Scoring:</b> {_check(entry.auto_scoring)}</td></tr>"
+        f"<tr><td><b>Weight:</b> {_text(entry.robot_weight)} lbs</td><td><b>Can Climb:</b> {_check(entry.can_climb)}</td></tr>"
+        f"<tr><td><b>Height:</b> {_text(entry.robot_height)} in</td><td><b>Vision:</b> {_check(entry.has_vision)}</td></tr>"
+        f"<tr><td><b>Language:</b> {_text(entry.programming_lang)}</td><td><b>Auto Paths:</b> {entry.auto_paths or 0}</td></tr>"
+        "</table>"
+        + _notes(('Strengths', entry.strengths), ('Weaknesses', entry.weaknesses), ('Strategy', entry.strategy_notes))
+        + f"<p><small>Scouted by: {_text(entry.scouter_name, 'Unknown')}</small></p></details>"
+    )
+
+def _match_row(m, disputed):
+    """One table row for a single scout's match entry."""
+    alliance = "🔴" if m.alliance == "Red" else "🔵"
+    issues = [label for flag, label in (
+        (m.died_on_field, "died"), (m.tipped_over, "tipped"), (m.exploded, "exploded")) if flag]
+    return (
+        f"<tr><td>{m.match_number} {alliance}{' ⚠️' if disputed else ''}</td>"
+        f"<td>{_check(m.auto_leave)} {m.auto_high or 0}/{m.auto_low or 0}</td>"
+        f"<td>{m.teleop_high or 0}/{m.teleop_low or 0} · {m.teleop_cycles or 0} cyc</td>"
+        f"<td>{_text(m.endgame_status, 'None')}{' + trap' if m.trap_scored else ''}</td>"
+        f"<td>{_stars(m.defense_rating)} / {_stars(m.driver_skill)}</td>"
+        f"<td>{'⚠️ ' + ', '.join(issues) if issues else ''}</td>"
+        f"<td>{_text(m.match_notes, '')}</td>"
+        f"<td>{_text(m.scouter_name, 'Unknown')}</td></tr>"
+    )
+
+@lru_cache(maxsize=CACHE_SIZE)
+def match_card(team, entries, disputed):
+    """Collapsible card of every scouted entry for one team.
+
+    `entries` are the team's rows in match order and `disputed` the match
+    numbers whose scouts disagree.
+    """
+    flag = f" ⚠️ scouts disagree on {len(disputed)}" if disputed else ""
+    return (
+        f"<details><summary>Team {_text(team)} - {len(entries)} entries{flag}</summary>"
+        "<table><tr><th>Match</th><th>Auto H/L</th><th>Teleop H/L</th><th>Endgame</th>"
+        "<th>Defense / Skill</th><th>Issues</th><th>Notes</th><th>Scout</th></tr>"
+        + ''.join(_match_row(m, m.match_number in disputed) for m in entries)
+        + "</table></details>"
+    )
+
+def _stat(label, value, detail=''):
+    detail = f" <small>{detail}</small>" if detail else ""
+    return f"<p>{label}<br><span style='{STAT_STYLE}'>{value}</span>{detail}</p>"
+
+@lru_cache(maxsize=CACHE_SIZE)
+def comparison_card(pit, consensus, trend):
+    """Side-by-side comparison card for one team.
+
+    `consensus` is the team's consensus rows and `trend` a (sparkline,
+    ewma, slope, reliability, variance) tuple, or None.
+    """
+    parts = [
+        f"<h3>Team {_text(pit.frc_team)}</h3><p><b>{_text(pit.team_name, 'Unknown')}</b></p><hr>",
+        f"<p><b>Specs:</b><br>🔧 {_text(pit.drivetrain)}<br>⚖️ {pit.robot_weight or 0} lbs<br>📏 {pit.robot_height or 0} in</p><hr>",
+        f"<p><b>Capabilities:</b><br>Auto Score: {_check(pit.auto_scoring)}<br>Climb: {_check(pit.can_climb)}"
+        f"<br>Vision: {_check(pit.has_vision)}<br>Auto Paths: {pit.auto_paths or 0}</p>",
+    ]
+    if consensus:
+        count = len(consensus)
+        avg_high = sum((m.teleop_high or 0) + (m.auto_high or 0) for m in consensus) / count
+        avg_cycles = sum(m.teleop_cycles or 0 for m in consensus) / count
+        avg_skill = sum(m.driver_skill or 3 for m in consensus) / count
+        parts += [
+            "<hr><p><b>Match Stats:</b></p>",
+            _stat("Matches", count),
+            _stat("Avg Scores", f"{avg_high:.1f}"),
+            _stat("Avg Cycles", f"{avg_cycles:.1f}"),
+            _stat("Avg Skill", f"{avg_skill:.1f}⭐"),
+        ]
+        if trend is not None:
+            sparkline, ewma, slope, reliability, variance = trend
+            parts += [
+                f"<hr><p><b>Trend:</b></p><pre>{html.escape(sparkline)}</pre>",
+                _stat("Recent (EWMA)", f"{ewma:.1f}", f"{slope:+.1f} pts/match"),
+                _stat("Reliability", f"{reliability:.0%}"),
+                f"<p><small>Std dev: {variance ** 0.5:.1f} pts</small></p>",
+            ]
+    return ''.join(parts)
@@ -0,0 +1,166 @@
+"""Process-wide feed of "session X changed" events.
+
+Every flush that touches pit scouting, match scores or the schedule writes a
+ChangeLog row per affected session, and on Postgres also sends a NOTIFY that
+is delivered when the transaction commits. One ChangeFeed per process turns
+those into per-session change counters that Streamlit sessions can check
+without touching the database.
+"""
+import select as select_module
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, event, func, or_, select, text
+from sqlalchemy.orm import Session
+
+from models import ChangeLog, MatchSchedule, MatchScore, PitScouting
+from snapshot import CLOCK_SKEW
+
+CHANNEL = 'scout_changes'
+POLL_INTERVAL = 2.0
+RETENTION = timedelta(days=1)
+PRUNE_INTERVAL = 3600.0
+TRACKED = (PitScouting, MatchScore, MatchSchedule)
+
+@event.listens_for(Session, 'before_flush')
+def _record_changes(db, flush_context, instances):
+    """Add a ChangeLog row for every session touched by this flush."""
+    changed = {
+        (obj.session_id, obj.__tablename__)
+        for obj in list(db.new) + list(db.dirty) + list(db.deleted)
+        if isinstance(obj, TRACKED) and obj.session_id is not None
+    }
+    for session_id, table_name in changed:
+        db.add(ChangeLog(session_id=session_id, table_name=table_name))
+    db.info.setdefault('changed_sessions', set()).update(s for s, _ in changed)
+
+@event.listens_for(Session, 'after_flush')
+def _notify_changes(db, flush_context):
+    """Queue a NOTIFY per changed session; Postgres delivers them on commit."""
+    changed = db.info.pop('changed_sessions', None)
+    if not changed or db.get_bind().dialect.name != 'postgresql':
+        return
+    for session_id in changed:
+        db.connection().execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {'channel': CHANNEL, 'payload': str(session_id)}
+        )
+
+class ChangeFeed:
+    """Background listener that counts changes per session."""
+
+    def __init__(self, engine, read_engine=None):
+        self.engine = engine
+        self.read_engine = read_engine
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._pruned_at = float('-inf')
+
+    def start(self):
+        """Start the listener thread (LISTEN on Postgres, polling otherwise).
+
+        With a separate read engine the feed polls that replica's change log
+        instead, since notifications are not replicated and a change is only
+        worth a rerun once the replica has it.
+        """
+        if self._thread is not None:
+            return self
+        listen = self.engine.dialect.name == 'postgresql' and self.read_engine is None
+        target = self._listen if listen else self._poll
+        self._thread = threading.Thread(target=self._run, args=(target,), name='change-feed', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Ask the listener thread to exit."""
+        self._stop.set()
+
+    def version(self, session_id):
+        """Return how many changes to `session_id` this process has seen."""
+        with self._lock:
+            return self._versions.get(session_id, 0)
+
+    def publish(self, session_id):
+        """Record a change to a session."""
+        with self._lock:
+            self._versions[session_id] = self._versions.get(session_id, 0) + 1
+
+    def _run(self, target):
+        """Run the listener, reconnecting with backoff after errors."""
+        delay = 1.0
+        while not self._stop.is_set():
+            try:
+                target()
+                delay = 1.0
+            except Exception:
+                self._stop.wait(delay)
+                delay = min(delay * 2, 30.0)
+
+    def _listen(self):
+        """Wait for Postgres notifications on a dedicated connection."""
+        raw = self.engine.raw_connection()
+        try:
+            dbapi = raw.dbapi_connection
+            dbapi.autocommit = True
+            cursor = dbapi.cursor()
+            cursor.execute(f"LISTEN {CHANNEL}")
+            while not self._stop.is_set():
+                self._prune()
+                if select_module.select([dbapi], [], [], POLL_INTERVAL) == ([], [], []):
+                    continue
+                dbapi.poll()
+                while dbapi.notifies:
+                    self.publish(int(dbapi.notifies.pop(0).payload))
+        finally:
+            raw.close()
+
+    def _prune(self):
+        """Delete change log rows older than RETENTION, at most once per PRUNE_INTERVAL.
+
+        Flushes write the log on every dialect, so both the LISTEN and the
+        polling loop prune it, always on the primary.
+        """
+        if time.monotonic() - self._pruned_at < PRUNE_INTERVAL:
+            return
+        with self.engine.connect() as conn:
+            conn.execute(delete(ChangeLog).where(ChangeLog.changed_at < datetime.utcnow() - RETENTION))
+            conn.commit()
+        self._pruned_at = time.monotonic()
+
+    def _poll(self):
+        """Poll the change log for rows not seen yet.
+
+        Ids are assigned before commit, so a row can become visible after a
+        higher id (concurrent writers, replica lag). Each poll re-reads rows
+        within CLOCK_SKEW of the newest change seen and skips ids it has
+        already published.
+        """
+        read_engine = self.read_engine or self.engine
+        with read_engine.connect() as conn:
+            cursor, latest = conn.execute(select(func.max(ChangeLog.id), func.max(ChangeLog.changed_at))).one()
+            cursor = cursor or 0
+            latest = latest or datetime.utcnow()
+            seen = set(conn.execute(select(ChangeLog.id).where(ChangeLog.changed_at > latest - CLOCK_SKEW)).scalars())
+        while not self._stop.is_set():
+            since = latest - CLOCK_SKEW
+            with read_engine.connect() as conn:
+                rows = conn.execute(
+                    select(ChangeLog.id, ChangeLog.session_id, ChangeLog.changed_at)
+                    .where(or_(ChangeLog.id > cursor, ChangeLog.changed_at > since))
+                ).all()
+            self._prune()
+            changed = set()
+            for row in rows:
+                if row.id in seen:
+                    continue
+                changed.add(row.session_id)
+                cursor = max(cursor, row.id)
+                latest = max(latest, row.changed_at)
+            # Only ids still inside the window can come back in a later poll.
+            seen = {row.id for row in rows if row.changed_at > latest - CLOCK_SKEW}
+            for session_id in changed:
+                self.publish(session_id)
+            self._stop.wait(POLL_INTERVAL)
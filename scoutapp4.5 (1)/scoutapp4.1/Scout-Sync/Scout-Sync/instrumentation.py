@@ -0,0 +1,142 @@
+"""Opt-in hot-path instrumentation: reruns, pages, SQL and image bytes.
+
+Set SCOUT_METRICS=1 to enable. When disabled nothing is hooked into
+SQLAlchemy and every helper here is a no-op. When enabled each rerun is
+written as one JSON line to the 'scout.metrics' logger, and statements
+slower than SCOUT_SLOW_QUERY_MS (default 200) are logged as warnings.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+ENABLED = os.environ.get('SCOUT_METRICS', '').lower() in ('1', 'true', 'yes')
+SLOW_QUERY_SECONDS = float(os.environ.get('SCOUT_SLOW_QUERY_MS', '200')) / 1000
+
+logger = logging.getLogger('scout.metrics')
+
+class Metrics:
+    """Process-wide counters plus per-thread stats for the current rerun."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reruns = 0
+        self.rerun_seconds = 0.0
+        self.pages = defaultdict(lambda: [0, 0.0])
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.image_bytes = 0
+        self.slow_queries = deque(maxlen=50)
+        self.recent_reruns = deque(maxlen=100)
+
+    def install(self):
+        """Hook SQL statement timing into every engine."""
+        event.listen(Engine, 'before_cursor_execute', self._before_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_execute)
+
+    def _current(self):
+        """Stats of the rerun running on this thread, if any."""
+        return getattr(self._local, 'rerun', None)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_start', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['metrics_start'].pop()
+        with self._lock:
+            self.sql_count += 1
+            self.sql_seconds += elapsed
+        current = self._current()
+        if current is not None:
+            current['sql_count'] += 1
+            current['sql_ms'] += elapsed * 1000
+        if elapsed >= SLOW_QUERY_SECONDS:
+            entry = {'ms': round(elapsed * 1000, 1), 'statement': ' '.join(statement.split())[:500]}
+            with self._lock:
+                self.slow_queries.append(entry)
+            logger.warning(json.dumps({'event': 'slow_query', **entry}, ensure_ascii=False))
+
+    @contextmanager
+    def rerun(self, session_id=None):
+        """Time one script run and log its totals."""
+        if not ENABLED:
+            yield
+            return
+        current = {'session_id': session_id, 'sql_count': 0, 'sql_ms': 0.0, 'image_bytes': 0, 'pages': {}}
+        self._local.rerun = current
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._local.rerun = None
+            current['ms'] = round(elapsed * 1000, 1)
+            current['sql_ms'] = round(current['sql_ms'], 1)
+            current['at'] = time.time()
+            with self._lock:
+                self.reruns += 1
+                self.rerun_seconds += elapsed
+                self.recent_reruns.append(current)
+            logger.info(json.dumps({'event': 'rerun', **current}, ensure_ascii=False))
+
+    @contextmanager
+    def page(self, name):
+        """Time one page within the current rerun."""
+        if not ENABLED:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.pages[name][0] += 1
+                self.pages[name][1] += elapsed
+            current = self._current()
+            if current is not None:
+                current['pages'][name] = round(elapsed * 1000, 1)
+
+    def count_image(self, data):
+        """Record bytes of an image sent to the browser."""
+        if not ENABLED or not data:
+            return
+        with self._lock:
+            self.image_bytes += len(data)
+        current = self._current()
+        if current is not None:
+            current['image_bytes'] += len(data)
+
+    def snapshot(self):
+        """Return all counters as plain data."""
+        with self._lock:
+            return {
+                'reruns': self.reruns,
+                'rerun_ms_avg': round(self.rerun_seconds / self.reruns * 1000, 1) if self.reruns else 0.0,
+                'sql_count': self.sql_count,
+                'sql_ms': round(self.sql_seconds * 1000, 1),
+                'image_bytes': self.image_bytes,
+                'pages': {
+                    name: {'count': count, 'ms_avg': round(seconds / count * 1000, 1)}
+                    for name, (count, seconds) in self.pages.items()
+                },
+                'slow_queries': list(self.slow_queries),
+                'recent_reruns': list(self.recent_reruns),
+            }
+
+metrics = Metrics()
+
+if ENABLED:
+    metrics.install()
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
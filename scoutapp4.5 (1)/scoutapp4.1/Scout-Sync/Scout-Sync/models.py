@@ -1,8 +1,14 @@
+import hashlib
 import os
+import threading
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, Float, DateTime, ForeignKey, LargeBinary
+from functools import lru_cache
+from sqlalchemy import (
+    create_engine, event, inspect, case, delete, exists, func, insert, literal, or_, select, text, true, type_coerce, union_all,
+    Column, Index, Integer, MetaData, String, Table, Text, Boolean, Float, DateTime, ForeignKey, LargeBinary
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import Session, sessionmaker, relationship
 
 Base = declarative_base()
 
@@ -88,6 +94,10 @@ class MatchScore(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
     
     session = relationship("ScoutingSession", back_populates="match_scores")
+    
+    __table_args__ = (
+        Index('ix_match_scores_session_match_team', 'session_id', 'match_number', 'frc_team'),
+    )
 
 class MatchSchedule(Base):
     """Match schedule for the competition."""
@@ -109,20 +119,277 @@ class MatchSchedule(Base):
     scheduled_time = Column(DateTime)
     is_completed = Column(Boolean, default=False)
 
-def get_engine():
-    """Create database engine."""
-    database_url = os.environ.get('DATABASE_URL')
-    if not database_url:
-        raise ValueError("DATABASE_URL environment variable not set")
+class ScheduleSlot(Base):
+    """One team's place in a scheduled match: the six team columns, normalized.
+
+    Derived from match_schedule by sync_schedule_slots, so per-team schedule
+    lookups are index reads instead of scans over six columns.
+    """
+    __tablename__ = 'schedule_slots'
+    
+    id = Column(Integer, primary_key=True)
+    session_id = Column(Integer, ForeignKey('scouting_sessions.id'), nullable=False)
+    schedule_id = Column(Integer, ForeignKey('match_schedule.id', ondelete='CASCADE'), nullable=False)
+    frc_team = Column(String(20), nullable=False)
+    match_number = Column(Integer, nullable=False)
+    alliance = Column(String(10), nullable=False)
+    station = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index('ix_schedule_slots_session_team_match', 'session_id', 'frc_team', 'match_number'),
+        Index('ix_schedule_slots_session_match', 'session_id', 'match_number'),
+    )
+
+SCHEDULE_STATIONS = (('Red', ('red_1', 'red_2', 'red_3')), ('Blue', ('blue_1', 'blue_2', 'blue_3')))
+
+def _unpivot_schedule(*criteria):
+    """Select one slot row per filled team column of the matching schedule rows."""
+    schedule = MatchSchedule.__table__
+    return union_all(*[
+        select(
+            schedule.c.session_id, schedule.c.id, func.trim(schedule.c[column]),
+            schedule.c.match_number, literal(alliance), literal(station)
+        ).where(func.coalesce(func.trim(schedule.c[column]), '') != '', *criteria)
+        for alliance, columns in SCHEDULE_STATIONS
+        for station, column in enumerate(columns, 1)
+    ])
+
+def _insert_slots(*criteria):
+    return insert(ScheduleSlot).from_select(
+        ['session_id', 'schedule_id', 'frc_team', 'match_number', 'alliance', 'station'],
+        _unpivot_schedule(*criteria)
+    )
+
+def insert_schedule_slots(db, *criteria):
+    """Add slots for matching schedule rows that have none yet; the caller commits."""
+    db.execute(_insert_slots(~exists().where(ScheduleSlot.schedule_id == MatchSchedule.id), *criteria))
+
+def sync_schedule_slots(db, schedule):
+    """Replace the slots of one added or edited schedule row; the caller commits."""
+    db.flush()
+    db.execute(delete(ScheduleSlot).where(ScheduleSlot.schedule_id == schedule.id))
+    db.execute(_insert_slots(MatchSchedule.id == schedule.id))
+
+class ChangeLog(Base):
+    """One row per write to a session's scouting data, for change polling."""
+    __tablename__ = 'change_log'
+    # Never reuse the id of a pruned or rolled-back row on SQLite.
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    id = Column(Integer, primary_key=True)
+    session_id = Column(Integer, nullable=False)
+    table_name = Column(String(50), nullable=False)
+    changed_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class AppliedWrite(Base):
+    """Id of a queued write, committed with it so a journal replay skips it."""
+    __tablename__ = 'applied_writes'
+    
+    id = Column(String(32), primary_key=True)
+    applied_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class ViewDefinition(Base):
+    """Hash of the SQL a view was created from, so a changed definition is recreated."""
+    __tablename__ = 'view_definitions'
+    
+    name = Column(String(50), primary_key=True)
+    sql_hash = Column(String(64), nullable=False)
+
+class SessionArchive(Base):
+    """Lifecycle of a session: closed by its team, then moved to cold storage."""
+    __tablename__ = 'session_archives'
+    
+    session_id = Column(Integer, ForeignKey('scouting_sessions.id'), primary_key=True)
+    closed_at = Column(DateTime)
+    archived_at = Column(DateTime)
+    path = Column(String(255))
+    pit_rows = Column(Integer, default=0)
+    match_rows = Column(Integer, default=0)
+    schedule_rows = Column(Integer, default=0)
+    size_bytes = Column(Integer, default=0)
+
+# Count fields take the median of all scouts' entries, with the form's defaults for blanks.
+CONSENSUS_COUNTS = {
+    'auto_high': 0, 'auto_low': 0, 'teleop_high': 0, 'teleop_low': 0, 'teleop_cycles': 0,
+    'defense_rating': 3, 'driver_skill': 3,
+}
+CONSENSUS_FLAGS = ('auto_leave', 'trap_scored', 'died_on_field', 'tipped_over', 'exploded')
+# Scouts whose counts differ by more than this are flagged as disagreeing.
+CONSENSUS_SPREAD = 2
+
+def _consensus_select():
+    """One consensus row per (session, match, team) over every scout's entry.
+
+    Counts are the median, flags the strict majority and the endgame the
+    most common status (the latest entry breaks ties). `disagreements`
+    counts the fields the scouts did not agree on.
+    """
+    m = MatchScore.__table__
+    team = func.trim(m.c.frc_team)
+    votes = select(
+        m.c.id, m.c.session_id, m.c.match_number, team.label('frc_team'), m.c.alliance,
+        m.c.endgame_status, m.c.timestamp,
+        *[func.coalesce(m.c[name], default).label(name) for name, default in CONSENSUS_COUNTS.items()],
+        *[case((m.c[name] == true(), 1), else_=0).label(name) for name in CONSENSUS_FLAGS],
+        func.count().over(partition_by=(m.c.session_id, m.c.match_number, team, m.c.endgame_status)).label('endgame_votes'),
+    ).subquery('votes')
+
+    v = votes.c
+    key = (v.session_id, v.match_number, v.frc_team)
+    ranked = select(
+        votes,
+        func.count().over(partition_by=key).label('scouts'),
+        func.row_number().over(partition_by=key, order_by=(v.endgame_votes.desc(), v.id.desc())).label('endgame_rank'),
+        *[func.row_number().over(partition_by=key, order_by=(v[name], v.id)).label(f'{name}_rank')
+          for name in CONSENSUS_COUNTS],
+    ).subquery('ranked')
+
+    r = ranked.c
+    scouts = func.max(r.scouts)
+    middle = lambda name: or_(r[f'{name}_rank'] == (r.scouts + 1) // 2, r[f'{name}_rank'] == (r.scouts + 2) // 2)
+    disagreements = [case((func.max(r[name]) - func.min(r[name]) > CONSENSUS_SPREAD, 1), else_=0) for name in CONSENSUS_COUNTS]
+    disagreements += [case((func.max(r[name]) != func.min(r[name]), 1), else_=0) for name in CONSENSUS_FLAGS]
+    disagreements.append(case((func.count(func.distinct(func.coalesce(r.endgame_status, ''))) > 1, 1), else_=0))
+    return select(
+        func.min(r.id).label('id'),
+        r.session_id,
+        r.match_number,
+        r.frc_team,
+        func.max(r.alliance).label('alliance'),
+        *[type_coerce(func.avg(case((middle(name), r[name]))), Float).label(name) for name in CONSENSUS_COUNTS],
+        *[type_coerce(func.sum(r[name]) * 2 > scouts, Boolean).label(name) for name in CONSENSUS_FLAGS],
+        func.max(case((r.endgame_rank == 1, r.endgame_status))).label('endgame_status'),
+        func.max(r.timestamp).label('timestamp'),
+        scouts.label('scouts'),
+        sum(disagreements[1:], disagreements[0]).label('disagreements'),
+    ).group_by(r.session_id, r.match_number, r.frc_team)
+
+# A view rather than a table, so it never needs refreshing; it is kept out of
+# Base.metadata so create_all doesn't make it a table.
+MatchConsensus = Table(
+    'match_consensus', MetaData(),
+    *[Column(c.name, c.type) for c in _consensus_select().selected_columns]
+)
+
+@lru_cache(maxsize=None)
+def _create_views(database_url):
+    """Create the SQL views and the indexes create_all won't add to existing tables.
+
+    Runs once per process and database, at startup. A view is recreated only
+    when it is missing or its stored definition hash differs from the
+    current SQL, so page loads never take DDL locks.
+    """
+    engine = _create_engine(database_url)
+    for index in MatchScore.__table__.indexes:
+        index.create(engine, checkfirst=True)
+    sql = str(_consensus_select().compile(engine, compile_kwargs={'literal_binds': True}))
+    sql_hash = hashlib.sha256(sql.encode()).hexdigest()
+    with engine.begin() as conn:
+        stored = conn.execute(
+            select(ViewDefinition.sql_hash).where(ViewDefinition.name == MatchConsensus.name)
+        ).scalar()
+        if stored == sql_hash and MatchConsensus.name in inspect(conn).get_view_names():
+            return
+        conn.execute(text(f"DROP VIEW IF EXISTS {MatchConsensus.name}"))
+        conn.execute(text(f"CREATE VIEW {MatchConsensus.name} AS {sql}"))
+        conn.execute(delete(ViewDefinition).where(ViewDefinition.name == MatchConsensus.name))
+        conn.execute(insert(ViewDefinition).values(name=MatchConsensus.name, sql_hash=sql_hash))
+
+@lru_cache(maxsize=None)
+def _backfill_schedule_slots(database_url):
+    """One-time migration: add slots for schedule rows written before the slot table existed."""
+    engine = _create_engine(database_url)
+    with engine.begin() as conn:
+        insert_schedule_slots(conn)
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scout.db')
+SQLITE_BUSY_TIMEOUT = 15
+
+# Tuned for one laptop serving a pit LAN: WAL lets reads run alongside the
+# single writer, and NORMAL sync is still durable across app crashes.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT * 1000}",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA cache_size=-32000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+_sqlite_write_lock = threading.Lock()
+
+def get_database_url():
+    """Get the database URL, defaulting to a local SQLite file."""
+    return os.environ.get('DATABASE_URL') or f"sqlite:///{DEFAULT_SQLITE_PATH}"
+
+def get_read_database_url():
+    """Get the URL for page reads and exports: DATABASE_READ_URL, else the primary.
+
+    Point it at a streaming replica (or a local mirror) to keep dashboards,
+    analytics and exports off the primary that form submits write to.
+    """
+    return os.environ.get('DATABASE_READ_URL') or get_database_url()
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the SQLite pragmas to a new connection."""
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+@lru_cache(maxsize=None)
+def _create_engine(database_url):
+    """Create one engine per database URL."""
+    if database_url.startswith('sqlite'):
+        engine = create_engine(database_url, connect_args={'timeout': SQLITE_BUSY_TIMEOUT})
+        event.listen(engine, 'connect', _set_sqlite_pragmas)
+        return engine
     return create_engine(database_url, pool_pre_ping=True)
 
+@event.listens_for(Session, 'before_flush')
+def _acquire_sqlite_writer(session, flush_context, instances):
+    """Let one SQLite write transaction per process run at a time.
+
+    The lock is taken before the first flush writes anything and held until
+    the transaction ends, so writers in this process queue here instead of
+    racing for the database lock; busy_timeout covers other processes.
+    """
+    if session.info.get('sqlite_writer') or session.get_bind().dialect.name != 'sqlite':
+        return
+    _sqlite_write_lock.acquire()
+    session.info['sqlite_writer'] = True
+
+@event.listens_for(Session, 'after_transaction_end')
+def _release_sqlite_writer(session, transaction):
+    """Release the SQLite write lock when the outermost transaction ends."""
+    if transaction.parent is None and session.info.pop('sqlite_writer', False):
+        _sqlite_write_lock.release()
+
+def get_engine():
+    """Get the shared database engine."""
+    return _create_engine(get_database_url())
+
+def get_read_engine():
+    """Get the shared engine for reads; the primary's when there is no replica."""
+    return _create_engine(get_read_database_url())
+
+@lru_cache(maxsize=None)
+def _sessionmaker(database_url):
+    """Create one session factory per database URL."""
+    return sessionmaker(bind=_create_engine(database_url))
+
 def get_session():
     """Create a new database session."""
-    engine = get_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return _sessionmaker(get_database_url())()
+
+def get_read_session():
+    """Create a new session for reads, on the replica when one is configured."""
+    return _sessionmaker(get_read_database_url())()
 
 def init_db():
     """Initialize the database tables."""
     engine = get_engine()
     Base.metadata.create_all(engine)
+    _create_views(get_database_url())
+    _backfill_schedule_slots(get_database_url())
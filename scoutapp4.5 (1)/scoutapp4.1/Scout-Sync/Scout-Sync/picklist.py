@@ -0,0 +1,91 @@
+"""Weighted pick-list ranking over every scouted team."""
+import heapq
+from functools import lru_cache
+
+import numpy as np
+
+from scoring import auto_points, endgame_points, teleop_points
+
+METRICS = {
+    'auto': "Auto Pts",
+    'teleop': "Teleop Pts",
+    'endgame': "Endgame Pts",
+    'cycles': "Cycles",
+    'driver_skill': "Driver Skill",
+    'defense': "Defense",
+    'reliability': "Reliability",
+    'opr': "OPR",
+}
+
+DEFAULT_WEIGHTS = {
+    'auto': 1.0,
+    'teleop': 1.0,
+    'endgame': 0.5,
+    'cycles': 0.5,
+    'driver_skill': 0.5,
+    'defense': 0.0,
+    'reliability': 1.0,
+    'opr': 1.0,
+}
+
+# Distinct weight settings whose scores each PickList keeps.
+SCORE_CACHE_SIZE = 32
+
+def team_stats(match_scores, ratings=None):
+    """Aggregate match rows into a (teams, matrix) pair in one grouped pass.
+
+    Row i of the matrix holds the averages of teams[i] for every metric in
+    METRICS order. Teams missing from `ratings` get an OPR of 0.
+    """
+    if not match_scores:
+        return [], np.zeros((0, len(METRICS)))
+    teams, group = np.unique([m.frc_team.strip() for m in match_scores], return_inverse=True)
+    rows = np.array([(
+        auto_points(m),
+        teleop_points(m),
+        endgame_points(m),
+        m.teleop_cycles or 0,
+        m.driver_skill or 3,
+        m.defense_rating or 3,
+        0 if (m.died_on_field or m.tipped_over) else 1,
+    ) for m in match_scores], dtype=float)
+    counts = np.bincount(group)
+    sums = np.column_stack([np.bincount(group, weights=rows[:, j]) for j in range(rows.shape[1])])
+    ratings = ratings or {}
+    opr = np.array([ratings.get(team, {}).get('opr', 0.0) for team in teams])
+    return list(teams), np.column_stack((sums / counts[:, None], opr))
+
+class PickList:
+    """Ranks teams by a weighted sum of standardized metrics.
+
+    Scores are cached for the last SCORE_CACHE_SIZE sets of weights; marking
+    teams as picked only filters the heap selection, so it never recomputes
+    the scores.
+    """
+
+    def __init__(self, teams, matrix):
+        self.teams = list(teams)
+        self.matrix = matrix
+        self._index = {team: i for i, team in enumerate(self.teams)}
+        std = matrix.std(axis=0) if len(matrix) else np.ones(len(METRICS))
+        self._z = (matrix - matrix.mean(axis=0)) / np.where(std > 0, std, 1) if len(matrix) else matrix
+        self._scores = lru_cache(maxsize=SCORE_CACHE_SIZE)(lambda key: self._z @ np.array(key))
+
+    def scores(self, weights):
+        """Return the score of every team for a {metric: weight} mapping."""
+        return self._scores(tuple(weights.get(name, 0.0) for name in METRICS))
+
+    def top(self, weights, k, picked=()):
+        """Return the k best (team, score) pairs, skipping teams in `picked`."""
+        picked = set(picked)
+        scores = self.scores(weights)
+        return heapq.nlargest(
+            k,
+            ((team, float(score)) for team, score in zip(self.teams, scores) if team not in picked),
+            key=lambda item: item[1]
+        )
+
+    def row(self, team):
+        """Return {metric: value} for one team."""
+        values = self.matrix[self._index[team]]
+        return dict(zip(METRICS, values))
@@ -0,0 +1,172 @@
+"""OPR/DPR/CCWM ratings computed from the match schedule and scouted scores."""
+import threading
+
+import numpy as np
+from scipy import linalg, sparse
+
+from scoring import total_points
+
+def alliance_scores(alliances, match_scores):
+    """Estimate alliance scores for every fully scouted match.
+
+    `alliances` yields (match_number, red_teams, blue_teams), as read from
+    the schedule slots. Returns {match_number: (red_teams, blue_teams,
+    red_score, blue_score)}.
+    A match is only included once all six teams have at least one scouted
+    row; duplicate rows for the same team are averaged.
+    """
+    per_team = {}
+    for m in match_scores:
+        per_team.setdefault((m.match_number, m.frc_team.strip()), []).append(total_points(m))
+
+    results = {}
+    for match_number, red, blue in alliances:
+        if len(red) != 3 or len(blue) != 3:
+            continue
+        totals = []
+        for teams in (red, blue):
+            points = [per_team.get((match_number, team)) for team in teams]
+            if any(p is None for p in points):
+                break
+            totals.append(sum(sum(p) / len(p) for p in points))
+        else:
+            results[match_number] = (red, blue, totals[0], totals[1])
+    return results
+
+def alliance_matrix(results, team_index):
+    """Build the sparse alliance-by-team matrix and its score vectors.
+
+    Each match contributes one row per alliance with a 1 in each member's
+    column. Returns (A, own_scores, opponent_scores).
+    """
+    rows, cols, own, opp = [], [], [], []
+    row = 0
+    for red, blue, red_score, blue_score in results.values():
+        for teams, score, other in ((red, red_score, blue_score), (blue, blue_score, red_score)):
+            for team in teams:
+                rows.append(row)
+                cols.append(team_index[team])
+            own.append(score)
+            opp.append(other)
+            row += 1
+    A = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)),
+        shape=(row, len(team_index))
+    )
+    return A, np.array(own, dtype=float), np.array(opp, dtype=float)
+
+class RatingEngine:
+    """OPR/DPR/CCWM solver that keeps its normal equations up to date.
+
+    The engine stores A^T A and A^T b instead of A itself, so adding,
+    changing or removing a single match is a rank-one update rather than a
+    rebuild of the whole matrix.
+    """
+
+    def __init__(self):
+        # Reentrant so rate() can hold it across sync() and solve().
+        self._lock = threading.RLock()
+        self._teams = []
+        self._index = {}
+        self._normal = np.zeros((0, 0))
+        self._own = np.zeros(0)
+        self._opp = np.zeros(0)
+        self._matches = {}
+        self._solution = None
+
+    def _grow(self, size):
+        """Resize the normal equations to hold at least `size` teams."""
+        capacity = len(self._own)
+        if size <= capacity:
+            return
+        old = capacity
+        capacity = max(size, capacity * 2, 16)
+        normal = np.zeros((capacity, capacity))
+        normal[:old, :old] = self._normal
+        own = np.zeros(capacity)
+        own[:old] = self._own
+        opp = np.zeros(capacity)
+        opp[:old] = self._opp
+        self._normal, self._own, self._opp = normal, own, opp
+
+    def _team_ids(self, teams):
+        """Map team numbers to column indexes, registering new teams."""
+        for team in teams:
+            if team not in self._index:
+                self._index[team] = len(self._teams)
+                self._teams.append(team)
+        self._grow(len(self._teams))
+        return np.array([self._index[team] for team in teams])
+
+    def _apply(self, entry, sign):
+        """Add (sign=1) or remove (sign=-1) one match from the normal equations."""
+        red, blue, red_score, blue_score = entry
+        for teams, score, other in ((red, red_score, blue_score), (blue, blue_score, red_score)):
+            idx = self._team_ids(teams)
+            np.add.at(self._normal, (np.repeat(idx, len(idx)), np.tile(idx, len(idx))), sign)
+            np.add.at(self._own, idx, sign * score)
+            np.add.at(self._opp, idx, sign * other)
+
+    def rebuild(self, results):
+        """Replace all matches, building the equations from the sparse matrix."""
+        with self._lock:
+            self._teams = sorted({team for red, blue, _, _ in results.values() for team in red + blue})
+            self._index = {team: i for i, team in enumerate(self._teams)}
+            A, own, opp = alliance_matrix(results, self._index)
+            self._normal = (A.T @ A).toarray()
+            self._own = A.T @ own
+            self._opp = A.T @ opp
+            self._matches = dict(results)
+            self._solution = None
+
+    def sync(self, results):
+        """Bring the engine in line with `results`, touching only changed matches."""
+        with self._lock:
+            if not self._matches:
+                self.rebuild(results)
+                return
+            for number in list(self._matches):
+                if number not in results:
+                    self._apply(self._matches.pop(number), -1)
+                    self._solution = None
+            for number, entry in results.items():
+                old = self._matches.get(number)
+                if old == entry:
+                    continue
+                if old is not None:
+                    self._apply(old, -1)
+                self._apply(entry, 1)
+                self._matches[number] = entry
+                self._solution = None
+
+    def solve(self):
+        """Return {team: {'opr', 'dpr', 'ccwm'}} for every team with a rated match."""
+        with self._lock:
+            if self._solution is not None:
+                return self._solution
+            n = len(self._teams)
+            if n == 0:
+                self._solution = {}
+                return self._solution
+            rhs = np.column_stack((self._own[:n], self._opp[:n]))
+            x = linalg.lstsq(self._normal[:n, :n], rhs, lapack_driver='gelsy')[0]
+            self._solution = {
+                team: {
+                    'opr': float(x[i, 0]),
+                    'dpr': float(x[i, 1]),
+                    'ccwm': float(x[i, 0] - x[i, 1]),
+                }
+                for i, team in enumerate(self._teams)
+                if self._normal[i, i] > 0
+            }
+            return self._solution
+
+    def rate(self, results):
+        """Sync to `results` and solve it under one lock.
+
+        Script threads share an engine per session, so a separate sync and
+        solve could return ratings for another thread's data version.
+        """
+        with self._lock:
+            self.sync(results)
+            return self.solve()
@@ -0,0 +1,40 @@
+"""Point values used to turn scouted match rows into scores."""
+
+AUTO_LEAVE_POINTS = 2
+AUTO_HIGH_POINTS = 5
+AUTO_LOW_POINTS = 2
+TELEOP_HIGH_POINTS = 2
+TELEOP_LOW_POINTS = 1
+TRAP_POINTS = 5
+
+ENDGAME_POINTS = {
+    "None": 0,
+    "Parked": 1,
+    "Climbed - Low": 3,
+    "Climbed - Mid": 3,
+    "Climbed - High": 3,
+    "Harmony Bonus": 5,
+}
+
+def auto_points(m):
+    """Points scored by a team in the autonomous period."""
+    return (
+        (AUTO_LEAVE_POINTS if m.auto_leave else 0)
+        + (m.auto_high or 0) * AUTO_HIGH_POINTS
+        + (m.auto_low or 0) * AUTO_LOW_POINTS
+    )
+
+def teleop_points(m):
+    """Points scored by a team in the teleop period."""
+    return (m.teleop_high or 0) * TELEOP_HIGH_POINTS + (m.teleop_low or 0) * TELEOP_LOW_POINTS
+
+def endgame_points(m):
+    """Points scored by a team in the endgame."""
+    points = ENDGAME_POINTS.get(m.endgame_status or "None", 0)
+    if m.trap_scored:
+        points += TRAP_POINTS
+    return points
+
+def total_points(m):
+    """Total points contributed by a team in one match."""
+    return auto_points(m) + teleop_points(m) + endgame_points(m)
@@ -0,0 +1,97 @@
+"""Monte Carlo match outcome simulation from scouted per-phase scores."""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from scoring import ENDGAME_POINTS, TRAP_POINTS, auto_points, teleop_points
+
+DEFAULT_SAMPLES = 5000
+# Below this many pairings, process start-up costs more than it saves.
+PARALLEL_THRESHOLD = 200
+
+def _profile(rows):
+    """Build a sampling profile from a list of MatchScore-like rows."""
+    healthy = [m for m in rows if not (m.died_on_field or m.tipped_over)]
+    endgame = {}
+    for m in healthy:
+        points = ENDGAME_POINTS.get(m.endgame_status or "None", 0) + (TRAP_POINTS if m.trap_scored else 0)
+        endgame[points] = endgame.get(points, 0) + 1
+    return {
+        'auto': np.array([auto_points(m) for m in rows], dtype=float),
+        'teleop': np.array([teleop_points(m) for m in healthy], dtype=float),
+        'endgame_points': np.array(list(endgame.keys()), dtype=float),
+        'endgame_probs': np.array(list(endgame.values()), dtype=float) / max(len(healthy), 1),
+        'failure_rate': 1 - len(healthy) / len(rows) if rows else 0.0,
+    }
+
+def team_profiles(match_scores):
+    """Build per-team sampling profiles, plus a pooled '*' fallback profile.
+
+    Auto points are drawn from every scouted row; teleop and endgame only
+    from rows where the robot stayed healthy, and a robot that dies or tips
+    over keeps its auto points but scores nothing afterwards.
+    """
+    by_team = {}
+    for m in match_scores:
+        by_team.setdefault(m.frc_team.strip(), []).append(m)
+    profiles = {team: _profile(rows) for team, rows in by_team.items()}
+    profiles['*'] = _profile(list(match_scores))
+    return profiles
+
+def _sample_team(profile, samples, rng):
+    """Draw `samples` match totals for one robot."""
+    if len(profile['auto']) == 0:
+        return np.zeros(samples)
+    total = rng.choice(profile['auto'], size=samples)
+    if len(profile['teleop']):
+        alive = rng.random(samples) >= profile['failure_rate']
+        total += alive * rng.choice(profile['teleop'], size=samples)
+        total += alive * rng.choice(profile['endgame_points'], size=samples, p=profile['endgame_probs'])
+    return total
+
+def simulate_match(red, blue, profiles, samples=DEFAULT_SAMPLES, seed=None):
+    """Simulate `samples` matches between two alliances.
+
+    Teams without scouted data are drawn from the pooled '*' profile.
+    Returns a dict with win/tie probabilities and mean alliance scores.
+    """
+    rng = np.random.default_rng(seed)
+    fallback = profiles.get('*', {'auto': np.zeros(0)})
+    scores = []
+    for alliance in (red, blue):
+        total = np.zeros(samples)
+        for team in alliance:
+            total += _sample_team(profiles.get(team, fallback), samples, rng)
+        scores.append(total)
+    red_scores, blue_scores = scores
+    return {
+        'red_win': float(np.mean(red_scores > blue_scores)),
+        'blue_win': float(np.mean(blue_scores > red_scores)),
+        'tie': float(np.mean(red_scores == blue_scores)),
+        'red_mean': float(red_scores.mean()),
+        'blue_mean': float(blue_scores.mean()),
+    }
+
+def _simulate_args(args):
+    """Unpack arguments for a worker process."""
+    return simulate_match(*args)
+
+def simulate_pairings(pairings, profiles, samples=DEFAULT_SAMPLES, seed=None, workers=None):
+    """Simulate many (red, blue) pairings, across processes when worthwhile.
+
+    Each pairing gets an independent random stream spawned from `seed`, so
+    results do not depend on how the work is split between processes.
+    """
+    pairings = list(pairings)
+    seeds = np.random.SeedSequence(seed).spawn(len(pairings))
+    jobs = [(red, blue, profiles, samples, s) for (red, blue), s in zip(pairings, seeds)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < PARALLEL_THRESHOLD:
+        return [_simulate_args(job) for job in jobs]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)),
+        mp_context=multiprocessing.get_context('spawn')
+    ) as pool:
+        return list(pool.map(_simulate_args, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
@@ -0,0 +1,277 @@
+"""Immutable, indexed in-memory view of one scouting session."""
+import threading
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from sqlalchemy import func, or_, select, tuple_
+
+from models import PitScouting, MatchConsensus, MatchScore, MatchSchedule, ScheduleSlot
+
+def _columns(model, exclude=()):
+    """Return the model's columns, minus any excluded by name."""
+    return [c for c in model.__table__.columns if c.name not in exclude]
+
+RECONCILE_INTERVAL = 300.0
+CLOCK_SKEW = timedelta(minutes=1)
+
+# Photos are left out of the records and loaded on demand by id.
+PIT_COLUMNS = _columns(PitScouting, exclude=('robot_photo',))
+MATCH_COLUMNS = _columns(MatchScore)
+SCHEDULE_COLUMNS = _columns(MatchSchedule)
+SLOT_COLUMNS = _columns(ScheduleSlot)
+
+PitRecord = namedtuple('PitRecord', [c.name for c in PIT_COLUMNS] + ['has_photo'])
+MatchRecord = namedtuple('MatchRecord', [c.name for c in MATCH_COLUMNS])
+ScheduleRecord = namedtuple('ScheduleRecord', [c.name for c in SCHEDULE_COLUMNS])
+SlotRecord = namedtuple('SlotRecord', [c.name for c in SLOT_COLUMNS])
+DataVersion = namedtuple('DataVersion', [
+    'pit_count', 'pit_max_id', 'pit_updated',
+    'match_count', 'match_max_id', 'match_updated',
+    'schedule_count', 'schedule_max_id', 'schedule_completed',
+])
+# One row per team per match, merged across scouts; see models.MatchConsensus.
+ConsensusRecord = namedtuple('ConsensusRecord', [c.name for c in MatchConsensus.columns])
+
+class SessionSnapshot:
+    """All rows of a session as tuples, indexed by team and match number.
+
+    `matches` holds every scout's entry; `consensus` holds one merged row
+    per team per match and is what statistics should be computed from.
+    """
+
+    __slots__ = (
+        'pit', 'matches', 'schedule', 'consensus', 'slots',
+        'pit_by_team', 'matches_by_team', 'matches_by_number', 'schedule_by_match', 'consensus_by_team',
+        'slots_by_team', 'slots_by_schedule', 'completed',
+    )
+
+    def __init__(self, pit, matches, schedule, consensus=(), slots=()):
+        self.pit = tuple(pit)
+        self.matches = tuple(matches)
+        self.schedule = tuple(sorted(schedule, key=lambda m: m.match_number))
+        self.consensus = tuple(sorted(consensus, key=lambda m: (m.match_number, m.frc_team)))
+        self.slots = tuple(sorted(slots, key=lambda s: (s.match_number, s.alliance != 'Red', s.station)))
+
+        self.pit_by_team = {p.frc_team: p for p in self.pit}
+
+        matches_by_team, matches_by_number = {}, {}
+        for m in self.matches:
+            matches_by_team.setdefault(m.frc_team, []).append(m)
+            matches_by_number.setdefault(m.match_number, []).append(m)
+        self.matches_by_team = {team: tuple(rows) for team, rows in matches_by_team.items()}
+        self.matches_by_number = {number: tuple(rows) for number, rows in matches_by_number.items()}
+
+        self.schedule_by_match = {}
+        for m in self.schedule:
+            self.schedule_by_match.setdefault(m.match_number, m)
+
+        consensus_by_team = {}
+        for m in self.consensus:
+            consensus_by_team.setdefault(m.frc_team, []).append(m)
+        self.consensus_by_team = {team: tuple(rows) for team, rows in consensus_by_team.items()}
+
+        slots_by_team, slots_by_schedule = {}, {}
+        for s in self.slots:
+            slots_by_team.setdefault(s.frc_team, []).append(s)
+            slots_by_schedule.setdefault(s.schedule_id, []).append(s)
+        self.slots_by_team = {team: tuple(rows) for team, rows in slots_by_team.items()}
+        self.slots_by_schedule = {schedule_id: tuple(rows) for schedule_id, rows in slots_by_schedule.items()}
+        self.completed = frozenset(m.id for m in self.schedule if m.is_completed)
+
+    def team_matches(self, team):
+        """Return every match row for a team."""
+        return self.matches_by_team.get(team, ())
+
+    def team_consensus(self, team):
+        """Return a team's consensus rows, one per match."""
+        return self.consensus_by_team.get(team.strip(), ())
+
+    def match_slots(self, match):
+        """Return a scheduled match's slots, Red 1 through Blue 3."""
+        return self.slots_by_schedule.get(match.id, ())
+
+    def match_alliances(self, match):
+        """Return the (red, blue) team tuples of a scheduled match."""
+        slots = self.match_slots(match)
+        return tuple(tuple(s.frc_team for s in slots if s.alliance == alliance) for alliance in ('Red', 'Blue'))
+
+    def alliances(self):
+        """Return (match_number, red, blue) for every scheduled match."""
+        return [(m.match_number, *self.match_alliances(m)) for m in self.schedule]
+
+    def team_schedule(self, team):
+        """Return a team's schedule slots in match order."""
+        return self.slots_by_team.get(team.strip(), ())
+
+    def next_match(self, team):
+        """Return the team's first slot in a match not yet completed, or None."""
+        return next((s for s in self.team_schedule(team) if s.schedule_id not in self.completed), None)
+
+    def search_teams(self, text):
+        """Return the team numbers containing `text`, scanning keys only."""
+        teams = set(self.pit_by_team) | set(self.matches_by_team)
+        return sorted(t for t in teams if text in t)
+
+def _load_pit(db, session_id, *criteria):
+    """Load pit records matching the given extra criteria."""
+    return [PitRecord._make(row) for row in db.query(
+        *PIT_COLUMNS, PitScouting.robot_photo.isnot(None)
+    ).filter(PitScouting.session_id == session_id, *criteria)]
+
+def _load_matches(db, session_id, *criteria):
+    """Load match records matching the given extra criteria."""
+    return [MatchRecord._make(row) for row in db.query(*MATCH_COLUMNS).filter(
+        MatchScore.session_id == session_id, *criteria
+    )]
+
+def _load_schedule(db, session_id):
+    """Load every schedule record of a session."""
+    return [ScheduleRecord._make(row) for row in db.query(*SCHEDULE_COLUMNS).filter(
+        MatchSchedule.session_id == session_id
+    )]
+
+def _load_slots(db, session_id):
+    """Load every schedule slot of a session."""
+    return [SlotRecord._make(row) for row in db.query(*SLOT_COLUMNS).filter(
+        ScheduleSlot.session_id == session_id
+    )]
+
+def _load_consensus(db, session_id, *criteria):
+    """Load consensus records matching the given extra criteria."""
+    return [ConsensusRecord._make(row) for row in db.execute(select(MatchConsensus).where(
+        MatchConsensus.c.session_id == session_id, *criteria
+    ))]
+
+def load_snapshot(db, session_id):
+    """Load a session as plain tuples, without building ORM objects."""
+    return SessionSnapshot(
+        _load_pit(db, session_id),
+        _load_matches(db, session_id),
+        _load_schedule(db, session_id),
+        _load_consensus(db, session_id),
+        _load_slots(db, session_id),
+    )
+
+def _newer_than(model, rows):
+    """Criteria for rows of `model` added or updated after `rows` were read.
+
+    Ids and timestamps are both assigned before commit, so the timestamp
+    high-water mark is moved back by CLOCK_SKEW to re-read rows that
+    committed late; merging by id makes the overlap harmless.
+    """
+    if not rows:
+        return ()
+    latest = max((r.timestamp for r in rows if r.timestamp), default=None)
+    criteria = [model.id > max(r.id for r in rows)]
+    if latest is not None:
+        criteria.append(model.timestamp > latest - CLOCK_SKEW)
+    return (or_(*criteria),)
+
+def _merge(rows, changed, key=lambda r: r.id):
+    """Replace or append `changed` records into `rows` by id."""
+    if not changed:
+        return rows
+    merged = {key(r): r for r in rows}
+    merged.update((key(r), r) for r in changed)
+    return merged.values()
+
+def _consensus_key(record):
+    return record.match_number, record.frc_team.strip()
+
+class SnapshotCache:
+    """Keeps one session's snapshot current by fetching only changed rows.
+
+    Pit and match rows newer than the cached high-water marks are merged in;
+    the schedule and its slots are small and reloaded whole when they change. Row counts in
+    the data version catch deletes and late commits, and a full reload also
+    happens every RECONCILE_INTERVAL seconds.
+    """
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.snapshot = None
+        self.version = None
+        self._reconciled_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db, version):
+        """Return a snapshot at least as new as `version`."""
+        with self._lock:
+            if self.snapshot is None or time.monotonic() - self._reconciled_at > RECONCILE_INTERVAL:
+                self._reload(db)
+            elif version != self.version:
+                self._refresh(db, version)
+            self.version = version
+            return self.snapshot
+
+    def _reload(self, db):
+        """Replace the snapshot with a full load."""
+        self.snapshot = load_snapshot(db, self.session_id)
+        self._reconciled_at = time.monotonic()
+
+    def _refresh(self, db, version):
+        """Merge in rows changed since the cached snapshot."""
+        old = self.snapshot
+        pit = _merge(old.pit, _load_pit(db, self.session_id, *_newer_than(PitScouting, old.pit)))
+        changed = _load_matches(db, self.session_id, *_newer_than(MatchScore, old.matches))
+        matches = _merge(old.matches, changed)
+        consensus = old.consensus
+        if changed:
+            # Re-merge only the team-matches whose entries changed.
+            keys = list({_consensus_key(m) for m in changed})
+            consensus = _merge(consensus, _load_consensus(
+                db, self.session_id,
+                tuple_(MatchConsensus.c.match_number, MatchConsensus.c.frc_team).in_(keys)
+            ), key=_consensus_key)
+        schedule, slots = old.schedule, old.slots
+        if self.version is None or _schedule_version(version) != _schedule_version(self.version):
+            schedule = _load_schedule(db, self.session_id)
+            slots = _load_slots(db, self.session_id)
+        snapshot = SessionSnapshot(pit, matches, schedule, consensus, slots)
+        counts = (len(snapshot.pit), len(snapshot.matches), len(snapshot.schedule))
+        if counts != (version.pit_count, version.match_count, version.schedule_count):
+            self._reload(db)
+        else:
+            self.snapshot = snapshot
+
+def load_photo(db, pit_id):
+    """Load one robot photo by pit scouting id."""
+    return db.query(PitScouting.robot_photo).filter(PitScouting.id == pit_id).scalar()
+
+def _schedule_version(version):
+    return version.schedule_count, version.schedule_max_id, version.schedule_completed
+
+def data_version(db, session_id):
+    """Return a DataVersion that changes whenever the session's data changes.
+
+    Computed in a single round trip from row counts, max ids, the latest
+    timestamps and the number of completed scheduled matches.
+    """
+    def stats(model, **aggregates):
+        return [
+            select(a).where(model.session_id == session_id).scalar_subquery().label(name)
+            for name, a in aggregates.items()
+        ]
+
+    row = db.execute(select(
+        *stats(
+            PitScouting,
+            pit_count=func.count(PitScouting.id),
+            pit_max_id=func.max(PitScouting.id),
+            pit_updated=func.max(PitScouting.timestamp),
+        ),
+        *stats(
+            MatchScore,
+            match_count=func.count(MatchScore.id),
+            match_max_id=func.max(MatchScore.id),
+            match_updated=func.max(MatchScore.timestamp),
+        ),
+        *stats(
+            MatchSchedule,
+            schedule_count=func.count(MatchSchedule.id),
+            schedule_max_id=func.max(MatchSchedule.id),
+            schedule_completed=func.count(MatchSchedule.id).filter(MatchSchedule.is_completed),
+        ),
+    )).one()
+    return DataVersion(**row._mapping)
@@ -0,0 +1,70 @@
+"""Per-team trend and consistency stats ordered by match number."""
+import numpy as np
+import pandas as pd
+
+from scoring import auto_points, endgame_points, teleop_points
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+def match_frame(matches):
+    """One row per (team, match), averaging duplicate scout entries."""
+    frame = pd.DataFrame({
+        'team': [m.frc_team.strip() for m in matches],
+        'match_number': [m.match_number for m in matches],
+        'auto': [auto_points(m) for m in matches],
+        'teleop': [teleop_points(m) for m in matches],
+        'endgame': [endgame_points(m) for m in matches],
+        'failed': [bool(m.died_on_field or m.tipped_over) for m in matches],
+    })
+    frame = frame.groupby(['team', 'match_number'], as_index=False).mean()
+    frame['total'] = frame['auto'] + frame['teleop'] + frame['endgame']
+    return frame.sort_values(['team', 'match_number'], ignore_index=True)
+
+def sparkline(values):
+    """Render a sequence of numbers as a unicode sparkline."""
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return ""
+    low, high = values.min(), values.max()
+    if high == low:
+        return SPARK_CHARS[len(SPARK_CHARS) // 2] * len(values)
+    idx = ((values - low) / (high - low) * (len(SPARK_CHARS) - 1)).round().astype(int)
+    return "".join(SPARK_CHARS[i] for i in idx)
+
+def team_trends(matches, window=3, span=4):
+    """Compute trend stats for every team in one grouped pass.
+
+    Returns a DataFrame indexed by team with the number of matches, overall
+    mean, rolling mean of the last `window` matches, EWMA, variance,
+    reliability (share of matches without a failure), least-squares slope
+    in points per match played, and a sparkline of match totals.
+    """
+    columns = ['matches', 'mean', 'rolling_mean', 'ewma', 'variance', 'reliability', 'slope', 'sparkline']
+    if not matches:
+        return pd.DataFrame(columns=columns)
+    frame = match_frame(matches)
+    grouped = frame.groupby('team', sort=False)['total']
+
+    frame['rolling_mean'] = grouped.rolling(window, min_periods=1).mean().reset_index(level=0, drop=True)
+    frame['ewma'] = grouped.ewm(span=span).mean().reset_index(level=0, drop=True)
+
+    # Slope against the order of play, from grouped sums instead of a fit per team.
+    frame['x'] = frame.groupby('team', sort=False).cumcount().astype(float)
+    frame['xy'] = frame['x'] * frame['total']
+    frame['xx'] = frame['x'] ** 2
+    sums = frame.groupby('team', sort=False)[['x', 'total', 'xy', 'xx']].sum()
+    n = grouped.size()
+    denom = n * sums['xx'] - sums['x'] ** 2
+    slope = (n * sums['xy'] - sums['x'] * sums['total']) / denom.where(denom != 0)
+
+    last = frame.groupby('team', sort=False).tail(1).set_index('team')
+    return pd.DataFrame({
+        'matches': n,
+        'mean': grouped.mean(),
+        'rolling_mean': last['rolling_mean'],
+        'ewma': last['ewma'],
+        'variance': grouped.var(ddof=0),
+        'reliability': 1 - frame.groupby('team', sort=False)['failed'].mean(),
+        'slope': slope.fillna(0.0),
+        'sparkline': grouped.agg(sparkline),
+    })[columns]
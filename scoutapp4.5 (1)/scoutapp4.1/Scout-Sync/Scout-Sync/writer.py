@@ -0,0 +1,321 @@
+"""Background group-commit writer for form submissions.
+
+A submit is appended to this process's journal file and fsynced, which is
+its durable acknowledgement, then queued for one writer thread. The thread
+applies everything waiting (up to MAX_BATCH jobs) in a single transaction,
+so an end-of-match burst costs a few commits instead of one per scout.
+
+Each job's id is committed to AppliedWrite along with the job, so jobs
+replayed from a journal after a crash are applied exactly once. Journals
+left by dead processes are claimed and replayed when a writer starts.
+Each database gets its own journal directory, so a writer only ever
+replays jobs that were meant for its own database.
+"""
+import base64
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, make_url
+from sqlalchemy.exc import OperationalError
+
+from models import AppliedWrite, MatchSchedule, MatchScore, PitScouting, sync_schedule_slots
+
+JOURNAL_DIR = os.environ.get('SCOUT_JOURNAL_DIR') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'journal')
+MAX_BATCH = 200
+BATCH_WINDOW = 0.02
+RETENTION = timedelta(days=1)
+PRUNE_INTERVAL = 3600.0
+MAX_STATUSES = 10000
+
+Job = namedtuple('Job', 'id kind session_id values')
+
+def journal_dir(database_url, root=JOURNAL_DIR):
+    """Journal directory for one database, keyed on its URL minus the password."""
+    url = make_url(database_url).set(password=None).render_as_string(hide_password=False)
+    return os.path.join(root, hashlib.sha256(url.encode()).hexdigest()[:16])
+
+def _apply_pit(db, session_id, values):
+    """Insert or update a team's pit scouting record."""
+    existing = db.query(PitScouting).filter(
+        PitScouting.session_id == session_id,
+        PitScouting.frc_team == values['frc_team']
+    ).first()
+    if not existing:
+        db.add(PitScouting(session_id=session_id, **values))
+        return
+    if not values.get('robot_photo'):
+        # Keep the stored photo when this submit has none.
+        values.pop('robot_photo', None)
+        values.pop('photo_filename', None)
+    for name, value in values.items():
+        setattr(existing, name, value)
+    existing.timestamp = datetime.utcnow()
+
+def _apply_match(db, session_id, values):
+    db.add(MatchScore(session_id=session_id, **values))
+
+def _apply_schedule(db, session_id, values):
+    match = MatchSchedule(session_id=session_id, **values)
+    db.add(match)
+    sync_schedule_slots(db, match)
+
+def _apply_complete(db, session_id, values):
+    # Set through the ORM, not a bulk update, so the flush logs the change
+    # and takes the SQLite writer lock.
+    match = db.query(MatchSchedule).filter(
+        MatchSchedule.session_id == session_id,
+        MatchSchedule.id == values['match_id']
+    ).first()
+    if match:
+        match.is_completed = True
+
+APPLY = {
+    'pit': _apply_pit,
+    'match': _apply_match,
+    'schedule': _apply_schedule,
+    'complete': _apply_complete,
+}
+
+def _encode(value):
+    """Make a submitted value JSON-serializable for the journal."""
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    return value
+
+def _decode(value):
+    if isinstance(value, dict) and '__bytes__' in value:
+        return base64.b64decode(value['__bytes__'])
+    if isinstance(value, dict) and '__datetime__' in value:
+        return datetime.fromisoformat(value['__datetime__'])
+    return value
+
+def _alive(pid):
+    """Whether a process with this id is running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class WriteQueue:
+    """Journaled queue drained by one group-committing writer thread."""
+
+    def __init__(self, session_factory, database_url, on_commit=None, journal_root=JOURNAL_DIR):
+        self.session_factory = session_factory
+        self.on_commit = on_commit
+        self.journal_dir = journal_dir(database_url, journal_root)
+        self._queue = queue.Queue()
+        self._journal_lock = threading.Lock()
+        self._journal = None
+        self._journal_path = None
+        self._outstanding = 0
+        self._status = OrderedDict()
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Open this process's journal, replay orphaned ones and start writing."""
+        if self._thread is not None:
+            return self
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self._journal_path = os.path.join(self.journal_dir, f"{os.getpid()}.ndjson")
+        orphans = self._claim_orphans()
+        self._journal = open(self._journal_path, 'a', encoding='utf-8')
+        for path in orphans:
+            self._replay(path)
+        self._thread = threading.Thread(target=self._run, name='write-queue', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Ask the writer thread to exit; unwritten jobs stay in the journal."""
+        self._stop.set()
+
+    def submit(self, kind, session_id, values):
+        """Durably journal a write, queue it and return its job id."""
+        if kind not in APPLY:
+            raise ValueError(f"Unknown write kind '{kind}'")
+        job = Job(uuid.uuid4().hex, kind, session_id, values)
+        self._append({'op': 'submit', 'id': job.id, 'kind': kind, 'session_id': session_id,
+                      'values': {k: _encode(v) for k, v in values.items()}}, job)
+        return job.id
+
+    def status(self, job_id):
+        """Return (state, error): state is 'queued', 'saved', 'failed' or 'unknown'."""
+        with self._changed:
+            return self._status.get(job_id, ('unknown', None))
+
+    def wait(self, job_id, timeout):
+        """Wait up to `timeout` seconds for a job to be saved or fail."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._status.get(job_id, ('unknown',))[0] != 'queued', timeout)
+            return self._status.get(job_id, ('unknown', None))
+
+    def forget(self, job_id):
+        """Drop a finished job's status once the UI has reported it."""
+        with self._changed:
+            self._status.pop(job_id, None)
+
+    def _set_status(self, job_ids, state, errors=None):
+        with self._changed:
+            for job_id in job_ids:
+                self._status[job_id] = (state, (errors or {}).get(job_id))
+                self._status.move_to_end(job_id)
+            while len(self._status) > MAX_STATUSES:
+                self._status.popitem(last=False)
+            self._changed.notify_all()
+
+    def _append(self, entry, job=None):
+        """Write one journal line and fsync it before acknowledging."""
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._journal_lock:
+            self._journal.write(line)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            if job is not None:
+                self._outstanding += 1
+                self._set_status([job.id], 'queued')
+                self._queue.put(job)
+
+    def _claim_orphans(self):
+        """Take over journals, and half-done replays, of processes no longer running."""
+        claimed = []
+        for name in sorted(os.listdir(self.journal_dir)):
+            stem, _, ext = name.partition('.')
+            pid = stem.split('-')[0]
+            if ext not in ('ndjson', 'replay') or not pid.isdigit():
+                continue
+            if int(pid) != os.getpid() and _alive(int(pid)):
+                continue
+            path = os.path.join(self.journal_dir, name)
+            target = os.path.join(self.journal_dir, f"{os.getpid()}-{uuid.uuid4().hex}.replay")
+            try:
+                # Rename is atomic, so only one starting process claims each journal.
+                os.rename(path, target)
+            except FileNotFoundError:
+                continue
+            claimed.append(target)
+        return claimed
+
+    def _replay(self, path):
+        """Re-journal and queue the unfinished jobs of a claimed journal."""
+        jobs = OrderedDict()
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line was never acknowledged.
+                    continue
+                if entry['op'] == 'submit':
+                    jobs[entry['id']] = entry
+                else:
+                    for job_id in entry['ids']:
+                        jobs.pop(job_id, None)
+        for entry in jobs.values():
+            values = {k: _decode(v) for k, v in entry['values'].items()}
+            self._append(entry, Job(entry['id'], entry['kind'], entry['session_id'], values))
+        os.remove(path)
+
+    def _run(self):
+        """Drain the queue in batches until stopped."""
+        last_prune = float('-inf')
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=1.0)]
+            except queue.Empty:
+                if time.monotonic() - last_prune > PRUNE_INTERVAL:
+                    last_prune = time.monotonic()
+                    self._prune()
+                continue
+            deadline = time.monotonic() + BATCH_WINDOW
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        """Commit a batch, retrying while the database is unreachable."""
+        delay = 1.0
+        while True:
+            try:
+                errors = self._commit_isolating(batch)
+                break
+            except OperationalError:
+                # The jobs are safe in the journal; try again shortly.
+                if self._stop.wait(delay):
+                    return
+                delay = min(delay * 2, 30.0)
+
+        ids = [job.id for job in batch]
+        self._append({'op': 'done', 'ids': ids})
+        with self._journal_lock:
+            self._outstanding -= len(batch)
+            if self._outstanding == 0:
+                # Everything journaled is written; start the journal afresh.
+                self._journal.truncate(0)
+        self._set_status([i for i in ids if i not in errors], 'saved')
+        self._set_status(list(errors), 'failed', errors)
+        if self.on_commit:
+            for session_id in {job.session_id for job in batch if job.id not in errors}:
+                self.on_commit(session_id)
+
+    def _commit_isolating(self, batch):
+        """Commit the batch, splitting it in half until bad jobs are isolated.
+
+        Returns {job id: error} for the jobs that could not be written.
+        """
+        try:
+            self._commit(batch)
+            return {}
+        except OperationalError:
+            raise
+        except Exception as e:
+            if len(batch) == 1:
+                return {batch[0].id: str(e).splitlines()[0]}
+        middle = len(batch) // 2
+        return {**self._commit_isolating(batch[:middle]), **self._commit_isolating(batch[middle:])}
+
+    def _commit(self, jobs):
+        """Apply jobs in one transaction, skipping any already applied."""
+        db = self.session_factory()
+        try:
+            applied = {job_id for job_id, in db.query(AppliedWrite.id).filter(
+                AppliedWrite.id.in_([job.id for job in jobs]))}
+            for job in jobs:
+                if job.id in applied:
+                    continue
+                APPLY[job.kind](db, job.session_id, dict(job.values))
+                db.add(AppliedWrite(id=job.id))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _prune(self):
+        """Forget applied ids older than any journal replay could need."""
+        db = self.session_factory()
+        try:
+            db.execute(delete(AppliedWrite).where(AppliedWrite.applied_at < datetime.utcnow() - RETENTION))
+            db.commit()
+        except OperationalError:
+            db.rollback()
+        finally:
+            db.close()